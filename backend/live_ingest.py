@@ -0,0 +1,296 @@
+"""
+Live Ingest - 实时追踪运行中 agent 写入的 REBEL 步骤日志
+每个 episode 是一个只追加的 JSONL 文件，每行一个步骤（step / obs / response），
+也可以包含 task、done 字段。新增内容按偏移量增量读取，解析后推送给订阅者。
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import os
+import time
+
+from trajectory_adapters import REBELJSONAdapter
+
+# 单个文件每轮最多读取的字节数，避免一个大文件拖慢其他 episode
+MAX_READ_BYTES = 4 << 20
+
+
+class LiveEpisode:
+    """单个正在运行的 episode"""
+
+    def __init__(self, episode_id: str, path: Path):
+        self.id = episode_id
+        self.path = path
+        # 以下几项只由轮询线程读写
+        self.offset = 0
+        self.pending = b""  # 尚未以换行结尾的不完整行
+        self.inode: Optional[int] = None
+        self.next_check = 0.0  # 压缩后的 episode 下次检查文件的时间
+        # 以下字段只在事件循环中更新
+        self.task = ""
+        self.done: Optional[str] = None
+        self.messages: List[Dict[str, Any]] = []
+        self.message_count = 0
+        self.steps = 0
+        self.invalid_lines = 0
+        self.updated_at = time.time()
+        # 结束且空闲超过 TTL 后释放消息列表，只保留摘要
+        self.compacted = False
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'task': self.task,
+            'task_type': REBELJSONAdapter.parse_task_type(self.task),
+            'status': 'running' if self.done is None else REBELJSONAdapter.parse_status(self.done),
+            'steps': self.steps,
+            'messages': self.message_count,
+            'invalid_lines': self.invalid_lines,
+            'updated_at': self.updated_at,
+            'compacted': self.compacted
+        }
+
+    def snapshot(self, messages: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """摘要 + 全部消息；已压缩的 episode 需传入从文件重新读取的消息"""
+        return {**self.summary(), 'messages': list(self.messages) if messages is None else messages}
+
+
+class LiveTailer:
+    """
+    轮询目录中的 episode 日志并增量解析
+
+    每轮只对文件做一次 stat，大小变化的文件才从上次的偏移量继续读取，
+    因此可以同时追踪数百个 episode 而不重复读取文件。
+    文件读取在线程池中进行，episode 的增删、状态更新和事件推送都在事件循环中进行，
+    保证订阅时拿到的快照与随后的增量事件不重不漏。
+
+    文件被删除的 episode 会被移除；已结束且空闲超过 episode_ttl 秒的 episode 会被压缩：
+    释放消息列表，之后每 episode_ttl 秒才检查一次文件，文件有变化时从头重新读取。
+    """
+
+    def __init__(self, directory: Path, pattern: str = "*.jsonl", poll_interval: float = 0.5,
+                 queue_size: int = 1000, episode_ttl: float = 600.0):
+        self.directory = directory
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.episode_ttl = episode_ttl
+        self.adapter = REBELJSONAdapter()
+        self.episodes: Dict[str, LiveEpisode] = {}
+        # episode ID -> 订阅队列；键 None 表示订阅所有 episode 的摘要变化
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}
+
+    def read_increments(self) -> Tuple[List[Tuple[LiveEpisode, bool, List[Dict[str, Any]]]], List[str]]:
+        """
+        读取所有文件新增的完整行（在线程池中运行，不修改 self.episodes）
+
+        Returns:
+            ([(episode, 是否需要从头重建, 新记录列表)], 文件已消失的 episode ID 列表)
+        """
+        updates = []
+        try:
+            entries = sorted(self.directory.glob(self.pattern))
+        except OSError as e:
+            print(f"Warning: Failed to scan {self.directory}: {e}")
+            return updates, []
+
+        now = time.time()
+        seen = set()
+        for path in entries:
+            seen.add(path.stem)
+            episode = self.episodes.get(path.stem)
+            if episode is not None and episode.compacted and now < episode.next_check:
+                continue
+
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            size = stat.st_size
+
+            if episode is None:
+                episode = LiveEpisode(path.stem, path)
+
+            truncated = size < episode.offset or (episode.inode is not None and stat.st_ino != episode.inode)
+            if episode.compacted:
+                if not truncated and size == episode.offset:
+                    episode.next_check = now + self.episode_ttl
+                    continue
+                # 消息已释放，文件有任何变化都从头重建
+                truncated = True
+            episode.inode = stat.st_ino
+            if truncated:
+                # 文件被截断或替换，从头开始
+                episode.offset = 0
+                episode.pending = b""
+            if size == episode.offset:
+                if truncated:
+                    updates.append((episode, True, []))
+                continue
+
+            with open(path, 'rb') as f:
+                f.seek(episode.offset)
+                data = f.read(min(size - episode.offset, MAX_READ_BYTES))
+            episode.offset += len(data)
+
+            lines = (episode.pending + data).split(b"\n")
+            episode.pending = lines.pop()
+            records = []
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    records.append(None)
+            updates.append((episode, truncated, records))
+
+        removed = [episode_id for episode_id in self.episodes if episode_id not in seen]
+        return updates, removed
+
+    def apply(self, episode: LiveEpisode, truncated: bool, records: List[Optional[Dict[str, Any]]]):
+        """把新记录应用到 episode 状态并推送事件（在事件循环中运行）"""
+        self.episodes.setdefault(episode.id, episode)
+        if truncated:
+            episode.task = ""
+            episode.done = None
+            episode.messages = []
+            episode.message_count = 0
+            episode.steps = 0
+            episode.invalid_lines = 0
+            episode.compacted = False
+            self._publish(episode.id, {'type': 'reset', 'episode': episode.id})
+
+        for record in records:
+            if not isinstance(record, dict):
+                episode.invalid_lines += 1
+                continue
+
+            if record.get('task'):
+                episode.task = record['task']
+                self._publish(episode.id, {'type': 'task', 'episode': episode.id, 'task': episode.task})
+
+            if 'obs' in record or 'response' in record:
+                messages = [m.to_dict() for m in self.adapter.parse_step(record)]
+                if not episode.task:
+                    episode.task = _task_from_observation(record.get('obs', ''))
+                episode.messages.extend(messages)
+                episode.message_count += len(messages)
+                episode.steps += sum(1 for m in messages if m['role'] == 'agent' and m['action'])
+                self._publish(episode.id, {
+                    'type': 'step',
+                    'episode': episode.id,
+                    'step': record.get('step', 0),
+                    'messages': messages
+                })
+
+            if 'done' in record:
+                episode.done = str(record['done'])
+                self._publish(episode.id, {
+                    'type': 'done',
+                    'episode': episode.id,
+                    'status': REBELJSONAdapter.parse_status(episode.done)
+                })
+
+        episode.updated_at = time.time()
+        self._publish(None, {'type': 'episode', **episode.summary()})
+
+    def remove(self, episode_id: str):
+        """移除文件已被删除的 episode（在事件循环中运行）"""
+        if self.episodes.pop(episode_id, None) is None:
+            return
+        event = {'type': 'removed', 'episode': episode_id}
+        self._publish(episode_id, event)
+        self._publish(None, event)
+
+    def compact_idle(self, now: Optional[float] = None):
+        """压缩已结束且空闲超过 TTL 的 episode（在事件循环中运行）"""
+        now = time.time() if now is None else now
+        for episode in self.episodes.values():
+            if episode.done is not None and not episode.compacted and now - episode.updated_at > self.episode_ttl:
+                episode.messages = []
+                episode.compacted = True
+                episode.next_check = now + self.episode_ttl
+
+    def load_messages(self, episode: LiveEpisode) -> List[Dict[str, Any]]:
+        """从文件重新读取已压缩 episode 的全部消息（在线程池中运行）"""
+        messages = []
+        with open(episode.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and ('obs' in record or 'response' in record):
+                    messages.extend(m.to_dict() for m in self.adapter.parse_step(record))
+        return messages
+
+    async def poll(self):
+        """轮询一次：读取增量、应用更新、移除已删除的 episode 并压缩空闲的 episode"""
+        loop = asyncio.get_running_loop()
+        updates, removed = await loop.run_in_executor(None, self.read_increments)
+        for episode, truncated, records in updates:
+            self.apply(episode, truncated, records)
+        for episode_id in removed:
+            self.remove(episode_id)
+        self.compact_idle()
+
+    async def run(self):
+        """轮询循环，直到任务被取消"""
+        print(f"Live ingest: tailing {self.directory / self.pattern}")
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Warning: Live ingest poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def subscribe(self, episode_id: Optional[str] = None) -> asyncio.Queue:
+        """订阅某个 episode（None 表示所有 episode 的摘要）"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(episode_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, episode_id: Optional[str] = None):
+        subscribers = self._subscribers.get(episode_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[episode_id]
+
+    def _publish(self, episode_id: Optional[str], event: Dict[str, Any]):
+        for queue in list(self._subscribers.get(episode_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 订阅者消费过慢：清空队列并放入 None 通知其断开，客户端重连后会重新拿到快照
+                self.unsubscribe(queue, episode_id)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+def _task_from_observation(obs: str) -> str:
+    """从初始观察中的 'Your task is to:' 提取任务"""
+    marker = 'Your task is to:'
+    start = obs.find(marker)
+    if start < 0:
+        return ""
+    start += len(marker)
+    end = obs.find('\n', start)
+    return obs[start:end if end >= 0 else len(obs)].strip()
+
+
+def create_tailer_from_env() -> Optional[LiveTailer]:
+    """LIVE_LOG_DIR 设置时创建实时追踪器"""
+    directory = os.environ.get("LIVE_LOG_DIR")
+    if not directory:
+        return None
+    return LiveTailer(
+        Path(directory),
+        pattern=os.environ.get("LIVE_LOG_PATTERN", "*.jsonl"),
+        poll_interval=float(os.environ.get("LIVE_POLL_INTERVAL", "0.5")),
+        episode_ttl=float(os.environ.get("LIVE_EPISODE_TTL", "600")),
+    )
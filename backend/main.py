@@ -3,13 +3,23 @@ Trajectory Viewer Backend - FastAPI Service
 提供轨迹数据的 REST API
 支持多种轨迹数据格式
 """
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict, Any
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
+import asyncio
+import json
 import os
+import random
+import threading
+import time
 from pathlib import Path
-from trajectory_adapters import TrajectoryLoader
+from live_ingest import create_tailer_from_env
+from trajectory_adapters import LoadProgress, TrajectoryLoader, source_exists
+from trajectory_compare import TaskGroupIndex, align_actions, trajectory_actions
+from trajectory_features import ACTION_VERBS
+from trajectory_table import FilterResultCache, SummaryTable, normalize_filters
 
 app = FastAPI(title="Trajectory Viewer API", version="2.0.0")
 
@@ -20,11 +30,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Partial-Results"],
 )
 
 # 全局变量存储轨迹数据
 trajectory_loader = TrajectoryLoader()
 processed_trajectories = []
+# 轨迹 ID -> processed_trajectories 下标
+trajectory_index: Dict[str, int] = {}
+# 归一化任务 -> 轨迹 ID 列表，用于同任务轨迹的比对
+task_groups = TaskGroupIndex()
+# 列式摘要表，第 i 行对应 processed_trajectories[i]，供列表和统计接口做向量化查询
+summary_table = SummaryTable()
+# 筛选结果缓存，键为归一化的筛选条件，随 summary_table.version 自动失效
+query_cache = FilterResultCache(max_entries=int(os.environ.get("QUERY_CACHE_SIZE", "256")))
+
+# 后台加载状态：数据在后台线程中加载，加载期间接口返回部分结果
+load_progress: List[LoadProgress] = []
+data_ready = threading.Event()
+# 后台加载在逐个数据源的异常处理之外失败时的错误信息
+load_error: Optional[str] = None
+
+# 数据源配置文件；配置中的相对路径以 DATA_ROOT（默认为仓库根目录）为基准
+DATA_SOURCES_CONFIG = Path(os.environ.get("DATA_SOURCES_CONFIG", Path(__file__).parent / "data_sources.json"))
+DATA_ROOT = Path(os.environ.get("DATA_ROOT", Path(__file__).parent.parent))
+
+# 加载未完成时，列表接口通过该响应头标记部分结果
+PARTIAL_HEADER = "X-Partial-Results"
+
+# 实时追踪运行中 agent 的步骤日志（设置 LIVE_LOG_DIR 时启用）
+live_tailer = create_tailer_from_env()
+# SSE 心跳间隔（秒）
+SSE_HEARTBEAT_SECONDS = 15
+
+# 同任务比对时每个请求最多对齐的轨迹数
+COMPARE_MAX_MEMBERS = int(os.environ.get("COMPARE_MAX_MEMBERS", "500"))
 
 
 class Message(BaseModel):
@@ -42,6 +82,11 @@ class TrajectoryInfo(BaseModel):
     status: str  # 'success' 或 'failed'
     steps: int
     task_type: str
+    cluster_id: Optional[str] = None  # 重复簇 ID（簇中第一条轨迹的 ID）
+    cluster_size: int = 1
+    loop_score: float = 0.0  # 与前一或前两个动作重复的动作占比
+    unique_locations: int = 0  # 访问过的不同位置数
+    verb_counts: Dict[str, int] = {}  # 动作动词直方图
 
 
 class TrajectoryDetail(BaseModel):
@@ -53,94 +98,299 @@ class TrajectoryDetail(BaseModel):
     task_type: str
     messages: List[Message]
     environment: str
+    cluster_id: Optional[str] = None
+    cluster_size: int = 1
+    loop_score: float = 0.0
+    unique_locations: int = 0
+    verb_counts: Dict[str, int] = {}
+
+
+def find_trajectory(trajectory_id: str) -> Dict[str, Any]:
+    """按 ID 查找轨迹，找不到时抛出 404（加载中为 503）"""
+    idx = trajectory_index.get(trajectory_id)
+    if idx is None:
+        if not data_ready.is_set():
+            raise HTTPException(status_code=503, detail="Trajectory data is still loading")
+        raise HTTPException(status_code=404, detail="Trajectory not found")
+    return processed_trajectories[idx]
 
 
+def _cluster_size(trajectory: Dict[str, Any]) -> int:
+    """查询轨迹所在重复簇的大小"""
+    if trajectory_loader.deduplicator is None:
+        return 1
+    return trajectory_loader.deduplicator.cluster_size(trajectory['metadata'].get('cluster_id'))
 
 
-@app.on_event("startup")
-async def load_data():
-    """启动时加载数据集"""
-    global processed_trajectories
-
-    # 定义数据源路径
-    base_path = Path(__file__).parent.parent
-    data_sources = [
-        base_path / "alfworld_expert_traj",  # HuggingFace dataset
-        base_path / "alfworld_expert_traj" / "rebel_coldstart_clean.json",  # REBEL JSON
+def configured_data_sources() -> List[Tuple[Path, Optional[str]]]:
+    """
+    数据源列表 [(路径, 格式)]，格式为 None 时自动检测
+
+    环境变量 DATA_SOURCES（以 os.pathsep 分隔的路径）优先，否则读取 data_sources.json 中启用的条目。
+    路径可以是压缩文件或分片通配符（如 alfworld_expert_traj/rebel_*.jsonl.zst）。
+    """
+    override = os.environ.get("DATA_SOURCES")
+    if override:
+        return [(DATA_ROOT / p.strip(), None) for p in override.split(os.pathsep) if p.strip()]
+
+    with open(DATA_SOURCES_CONFIG, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return [
+        (DATA_ROOT / entry['path'], entry.get('type'))
+        for entry in config.get('data_sources', [])
+        if entry.get('enabled', True)
     ]
 
+
+def load_all_sources():
+    """
+    依次加载所有数据源（在后台线程中运行）
+
+    轨迹逐条追加到 processed_trajectories，进度写入 load_progress
+    """
+    data_sources = configured_data_sources()
+    load_progress[:] = [LoadProgress(str(path), format_type) for path, format_type in data_sources]
+
     # 加载所有可用的数据源
-    for data_path in data_sources:
-        if data_path.exists():
-            try:
-                trajectories = trajectory_loader.load(data_path)
-                # 转换为字典格式以保持向后兼容
-                for traj in trajectories:
-                    processed_trajectories.append(traj.to_dict())
-                print(f"Loaded {len(trajectories)} trajectories from {data_path.name}")
-            except Exception as e:
-                print(f"Warning: Failed to load {data_path}: {e}")
-        else:
+    for (data_path, format_type), progress in zip(data_sources, load_progress):
+        if not source_exists(data_path):
             print(f"Warning: Data source not found at {data_path}")
-
+            progress.status = 'failed'
+            progress.error = 'not found'
+            continue
+
+        progress.status = 'loading'
+        progress.started_at = time.time()
+        try:
+            # 流式消费，原始数据不会整体驻留内存
+            for traj in trajectory_loader.iter_load(data_path, format_type, progress=progress):
+                # 转换为字典格式以保持向后兼容
+                traj_dict = traj.to_dict()
+                idx = len(processed_trajectories)
+                processed_trajectories.append(traj_dict)
+                summary_table.append(traj_dict, traj.features)
+                # 数据和特征行都写入后才登记索引，请求线程按 ID 查到的轨迹总是完整的；
+                # 任务分组中的 ID 会被直接查索引，因此放在最后
+                trajectory_index[traj_dict['id']] = idx
+                task_groups.add(traj_dict)
+            progress.status = 'done'
+            print(f"Loaded {progress.items_parsed} trajectories from {data_path.name}")
+        except Exception as e:
+            progress.status = 'failed'
+            progress.error = str(e)
+            print(f"Warning: Failed to load {data_path}: {e}")
+        finally:
+            progress.finished_at = time.time()
+
+    data_ready.set()
     print(f"Total processed trajectories: {len(processed_trajectories)}")
 
 
+def reset_loaded_data():
+    """清空已加载的数据和加载状态（启动加载前调用，重复启动时不会追加重复的行）"""
+    global load_error
+    data_ready.clear()
+    load_error = None
+    load_progress.clear()
+    processed_trajectories.clear()
+    trajectory_index.clear()
+    task_groups.reset()
+    summary_table.reset()
+    query_cache.clear()
+    if trajectory_loader.deduplicator is not None:
+        trajectory_loader.deduplicator.reset()
+
+
+def _on_load_done(future: asyncio.Future):
+    """后台加载结束：异常不会被其他地方观察到，在这里记录并把未完成的数据源标记为失败"""
+    global load_error
+    if future.cancelled() or future.exception() is None:
+        return
+    error = future.exception()
+    load_error = f"{type(error).__name__}: {error}"
+    print(f"Error: Background data loading failed: {load_error}")
+    for progress in load_progress:
+        if progress.status in ('pending', 'loading'):
+            progress.status = 'failed'
+            progress.error = load_error
+
+
+def _summary_fields(trajectory: Dict[str, Any]) -> Dict[str, Any]:
+    """列表和详情共用的摘要字段"""
+    return {
+        "id": trajectory['id'],
+        "task": trajectory['task'],
+        "status": trajectory['status'],
+        "steps": trajectory['steps'],
+        "task_type": trajectory['task_type'],
+        "cluster_id": trajectory['metadata'].get('cluster_id'),
+        "cluster_size": _cluster_size(trajectory)
+    }
+
+
+@app.on_event("startup")
+async def load_data():
+    """启动时在后台线程加载数据集，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    reset_loaded_data()
+    app.state.load_future = loop.run_in_executor(None, load_all_sources)
+    app.state.load_future.add_done_callback(_on_load_done)
+    if live_tailer is not None:
+        app.state.live_task = asyncio.create_task(live_tailer.run())
+
+
+@app.on_event("shutdown")
+async def stop_live_ingest():
+    """停止实时追踪"""
+    live_task = getattr(app.state, "live_task", None)
+    if live_task is not None:
+        live_task.cancel()
+
+
+def loading_status() -> Dict[str, Any]:
+    """当前加载状态"""
+    return {
+        "ready": data_ready.is_set(),
+        "trajectories_loaded": len(processed_trajectories),
+        "error": load_error,
+        "sources": [p.to_dict() for p in load_progress]
+    }
+
+
 @app.get("/")
 async def root():
     """健康检查"""
     return {
         "status": "ok",
         "message": "Trajectory Viewer API is running",
+        "ready": data_ready.is_set(),
         "trajectories_loaded": len(processed_trajectories)
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """存活检查：事件循环可以响应即视为存活"""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """就绪检查：所有数据源加载完成前返回 503，并附带各数据源的加载进度；后台加载异常退出时 error 给出原因"""
+    status = loading_status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @app.get("/api/trajectories", response_model=List[TrajectoryInfo])
 async def get_trajectories(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     status: Optional[str] = Query(None, regex="^(success|failed|unknown)$"),
     task_type: Optional[str] = Query(None),
     min_steps: Optional[int] = Query(None, ge=0),
     max_steps: Optional[int] = Query(None, ge=0),
+    cluster_id: Optional[str] = Query(None),
+    unique_only: bool = Query(False),
+    min_loop_score: Optional[float] = Query(None, ge=0, le=1),
+    max_loop_score: Optional[float] = Query(None, ge=0, le=1),
+    min_unique_locations: Optional[int] = Query(None, ge=0),
+    max_unique_locations: Optional[int] = Query(None, ge=0),
+    verb: Optional[str] = Query(None, regex=f"^({'|'.join(ACTION_VERBS)})$"),
+    min_verb_count: Optional[int] = Query(None, ge=0),
+    sort_by: Optional[str] = Query(None, regex="^(steps|loop_score|unique_locations|verb_count)$"),
+    order: str = Query("asc", regex="^(asc|desc)$"),
 ):
     """
-    获取轨迹列表（支持分页和筛选）
-    """
-    if not processed_trajectories:
-        return []
+    获取轨迹列表（支持分页、筛选和排序）
 
-    # 筛选
-    filtered = processed_trajectories
+    verb + min_verb_count 按某个动作动词的次数筛选，sort_by=verb_count 按 verb 的次数排序。
+    数据仍在加载时返回已加载部分，并设置 X-Partial-Results: true
+    """
+    if not data_ready.is_set():
+        response.headers[PARTIAL_HEADER] = "true"
+
+    if (sort_by == 'verb_count' or min_verb_count is not None) and not verb:
+        raise HTTPException(status_code=400, detail="verb is required for verb_count filters and sorting")
+
+    # 筛选（unique_only: 每个重复簇只保留代表轨迹），同一筛选条件的各分页共用缓存的行号
+    key = normalize_filters(
+        status=status,
+        task_type=task_type,
+        min_steps=min_steps,
+        max_steps=max_steps,
+        cluster_id=cluster_id,
+        unique_only=unique_only,
+        min_loop_score=min_loop_score,
+        max_loop_score=max_loop_score,
+        min_unique_locations=min_unique_locations,
+        max_unique_locations=max_unique_locations,
+        verb=verb,
+        min_verb_count=min_verb_count,
+        sort_by=sort_by,
+        descending=order == "desc",
+    )
+    rows = query_cache.get_or_compute(key, summary_table.version, lambda: summary_table.filter(**dict(key)))
 
-    if status:
-        filtered = [t for t in filtered if t['status'] == status]
+    # 分页，转换为响应模型
+    return [
+        TrajectoryInfo(**_summary_fields(processed_trajectories[row]), **summary_table.features(row))
+        for row in rows[skip:skip + limit]
+    ]
 
-    if task_type:
-        filtered = [t for t in filtered if t['task_type'] == task_type]
 
-    if min_steps is not None:
-        filtered = [t for t in filtered if t['steps'] >= min_steps]
+@app.get("/api/sample")
+async def sample_trajectories(
+    response: Response,
+    size: int = Query(50, ge=1, le=1000),
+    strategy: str = Query("stratified", regex="^(uniform|stratified)$"),
+    stratify_by: str = Query("task_type,status", regex="^(task_type|status|task_type,status|status,task_type)$"),
+    allocation: str = Query("proportional", regex="^(proportional|equal)$"),
+    seed: Optional[int] = Query(None),
+    status: Optional[str] = Query(None, regex="^(success|failed|unknown)$"),
+    task_type: Optional[str] = Query(None),
+    include_details: bool = Query(False),
+):
+    """
+    随机抽样（均匀或按 task_type / status 分层），开销与样本量成正比
 
-    if max_steps is not None:
-        filtered = [t for t in filtered if t['steps'] <= max_steps]
+    未指定 seed 时随机生成并在响应中返回，用相同的 seed 可复现同一样本。
+    include_details=true 时直接返回每条轨迹的完整详情。
+    """
+    if not data_ready.is_set():
+        response.headers[PARTIAL_HEADER] = "true"
+
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    strata_fields = tuple(stratify_by.split(',')) if strategy == "stratified" else ()
+
+    rows, strata = summary_table.sample(
+        size,
+        random.Random(seed),
+        stratify_by=strata_fields,
+        allocation=allocation,
+        status=status,
+        task_type=task_type,
+    )
 
-    # 分页
-    total = len(filtered)
-    results = filtered[skip:skip + limit]
+    model = TrajectoryDetail if include_details else TrajectoryInfo
+    items = []
+    for row in rows:
+        trajectory = processed_trajectories[row]
+        fields = {**_summary_fields(trajectory), **summary_table.features(row)}
+        if include_details:
+            fields.update(messages=trajectory['messages'], environment=trajectory['environment'])
+        items.append(model(**fields))
 
-    # 转换为响应模型
-    return [
-        TrajectoryInfo(
-            id=t['id'],
-            task=t['task'],
-            status=t['status'],
-            steps=t['steps'],
-            task_type=t['task_type']
-        )
-        for t in results
-    ]
+    return {
+        "strategy": strategy,
+        "seed": seed,
+        "size": len(items),
+        "population": sum(s['population'] for s in strata),
+        "strata": strata,
+        "partial": not data_ready.is_set(),
+        "items": items
+    }
 
 
 @app.get("/api/trajectories/{trajectory_id}", response_model=TrajectoryDetail)
@@ -148,89 +398,275 @@ async def get_trajectory_detail(trajectory_id: str):
     """
     获取单条轨迹的详细信息
     """
-    # 查找轨迹
-    trajectory = next((t for t in processed_trajectories if t['id'] == trajectory_id), None)
-
-    if not trajectory:
-        raise HTTPException(status_code=404, detail="Trajectory not found")
+    trajectory = find_trajectory(trajectory_id)
 
     return TrajectoryDetail(
-        id=trajectory['id'],
-        task=trajectory['task'],
-        status=trajectory['status'],
-        steps=trajectory['steps'],
-        task_type=trajectory['task_type'],
+        **_summary_fields(trajectory),
+        **summary_table.features(trajectory_index[trajectory_id]),
         messages=trajectory['messages'],
         environment=trajectory['environment']
     )
 
 
+@app.get("/api/trajectories/{trajectory_id}/group")
+async def get_task_group(trajectory_id: str):
+    """
+    获取与该轨迹任务相同的所有轨迹
+    """
+    trajectory = find_trajectory(trajectory_id)
+    members = task_groups.group_of(trajectory_id) or [trajectory_id]
+
+    return {
+        "task": trajectory['task'],
+        "total": len(members),
+        "members": [
+            {
+                "id": t['id'],
+                "status": t['status'],
+                "steps": t['steps'],
+                "source": t['metadata'].get('source', 'unknown')
+            }
+            for t in (processed_trajectories[trajectory_index[m]] for m in members)
+        ]
+    }
+
+
+@app.get("/api/trajectories/{trajectory_id}/compare")
+async def compare_with_group(
+    trajectory_id: str,
+    source: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """
+    将轨迹与同任务的其他轨迹逐一比对，返回相似度和分歧点（按相似度降序）
+
+    source 可限定比对对象的数据源，例如 huggingface（专家轨迹）。
+    对齐在线程池中进行，每个请求最多对齐 COMPARE_MAX_MEMBERS 条（按加载顺序），
+    total 为符合条件的轨迹数，aligned 为实际对齐的条数
+    """
+    trajectory = find_trajectory(trajectory_id)
+    actions = trajectory_actions(trajectory)
+
+    candidates = []
+    for member_id in task_groups.group_of(trajectory_id) or []:
+        if member_id == trajectory_id:
+            continue
+        other = processed_trajectories[trajectory_index[member_id]]
+        if source and other['metadata'].get('source', 'unknown') != source:
+            continue
+        candidates.append(other)
+
+    def align_members():
+        results = []
+        for other in candidates[:COMPARE_MAX_MEMBERS]:
+            alignment = align_actions(actions, trajectory_actions(other))
+            results.append({
+                "id": other['id'],
+                "source": other['metadata'].get('source', 'unknown'),
+                "status": other['status'],
+                "steps": other['steps'],
+                "similarity": alignment['similarity'],
+                "divergence": alignment['divergence']
+            })
+        results.sort(key=lambda r: -r['similarity'])
+        return results
+
+    results = await asyncio.get_running_loop().run_in_executor(None, align_members)
+    return {
+        "id": trajectory_id,
+        "task": trajectory['task'],
+        "total": len(candidates),
+        "aligned": len(results),
+        "results": results[:limit]
+    }
+
+
+@app.get("/api/compare")
+async def compare_trajectories(a: str = Query(...), b: str = Query(...)):
+    """
+    对齐两条轨迹的动作序列，返回逐步差分和分歧点
+
+    差分下标为动作序列（agent 有 action 的消息）中的位置；对齐在线程池中进行，不阻塞事件循环
+    """
+    traj_a = find_trajectory(a)
+    traj_b = find_trajectory(b)
+    actions_a = trajectory_actions(traj_a)
+    actions_b = trajectory_actions(traj_b)
+    alignment = await asyncio.get_running_loop().run_in_executor(None, align_actions, actions_a, actions_b)
+
+    return {
+        "a": {"id": a, "status": traj_a['status'], "steps": len(actions_a)},
+        "b": {"id": b, "status": traj_b['status'], "steps": len(actions_b)},
+        "same_task": task_groups.task_keys.get(a) == task_groups.task_keys.get(b),
+        **alignment
+    }
+
+
 @app.get("/api/statistics")
 async def get_statistics():
     """
     获取统计信息
+
+    数据仍在加载时基于已加载部分计算，并返回 partial: true
     """
-    if not processed_trajectories:
-        return {
-            "total": 0,
-            "by_status": {},
-            "by_task_type": {},
-            "by_source": {},
-            "avg_steps": 0
-        }
-
-    total = len(processed_trajectories)
-
-    # 按状态统计
-    by_status = {}
-    for t in processed_trajectories:
-        status = t['status']
-        by_status[status] = by_status.get(status, 0) + 1
-
-    # 按任务类型统计
-    by_task_type = {}
-    for t in processed_trajectories:
-        task_type = t['task_type']
-        by_task_type[task_type] = by_task_type.get(task_type, 0) + 1
-
-    # 按数据源统计
-    by_source = {}
-    for t in processed_trajectories:
-        source = t['metadata'].get('source', 'unknown')
-        by_source[source] = by_source.get(source, 0) + 1
-
-    # 平均步数
-    total_steps = sum(t['steps'] for t in processed_trajectories)
-    avg_steps = total_steps / total if total > 0 else 0
+    # 按状态 / 任务类型 / 数据源统计、平均步数和去重统计
+    statistics = summary_table.statistics()
+    statistics["partial"] = not data_ready.is_set()
+    return statistics
 
-    return {
-        "total": total,
-        "by_status": by_status,
-        "by_task_type": by_task_type,
-        "by_source": by_source,
-        "avg_steps": round(avg_steps, 2)
-    }
+
+def _require_live_tailer():
+    """实时追踪未启用时返回 404"""
+    if live_tailer is None:
+        raise HTTPException(status_code=404, detail="Live ingest is disabled (set LIVE_LOG_DIR)")
+    return live_tailer
+
+
+def _live_episode(episode_id: str):
+    episode = _require_live_tailer().episodes.get(episode_id)
+    if episode is None:
+        raise HTTPException(status_code=404, detail="Live episode not found")
+    return episode
+
+
+async def _live_snapshot(episode, queue: Optional[asyncio.Queue] = None) -> Dict[str, Any]:
+    """
+    episode 快照；已压缩的 episode 从文件重新读取消息
+
+    queue 为调用前已建立的订阅。读取文件期间 episode 可能被重建并推送 reset / step 事件，
+    此时改用内存中的快照，并丢弃队列中已被该快照包含的事件
+    """
+    if not episode.compacted:
+        return episode.snapshot()
+    loop = asyncio.get_running_loop()
+    try:
+        messages = await loop.run_in_executor(None, live_tailer.load_messages, episode)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Live episode not found")
+    if episode.compacted:
+        # 压缩状态下不会推送该 episode 的步骤事件，文件内容即为完整快照
+        return episode.snapshot(messages)
+
+    if queue is not None:
+        pending = []
+        while not queue.empty():
+            event = queue.get_nowait()
+            # 移除事件不在快照中，保留
+            if event is None or event['type'] == 'removed':
+                pending.append(event)
+        for event in pending:
+            queue.put_nowait(event)
+    return episode.snapshot()
+
+
+def _sse_response(request: Request, episode_id: Optional[str], initial: Optional[Dict[str, Any]] = None,
+                  queue: Optional[asyncio.Queue] = None):
+    """
+    以 Server-Sent Events 推送实时事件
+
+    订阅须在生成初始快照之前建立（由调用方传入 queue，或在这里与快照同一次调度中建立），
+    快照之后的增量事件不会与快照重复或遗漏
+    """
+    tailer = _require_live_tailer()
+    if queue is None:
+        queue = tailer.subscribe(episode_id)
+
+    async def event_stream():
+        try:
+            if initial is not None:
+                yield f"event: snapshot\ndata: {json.dumps(initial, ensure_ascii=False)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # 消费过慢被断开，客户端重连后重新获取快照
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            tailer.unsubscribe(queue, episode_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/live/episodes")
+async def get_live_episodes():
+    """
+    获取实时追踪中的 episode 列表（按最近更新时间降序）
+    """
+    tailer = _require_live_tailer()
+    episodes = [e.summary() for e in list(tailer.episodes.values())]
+    episodes.sort(key=lambda e: -e['updated_at'])
+    return {"total": len(episodes), "episodes": episodes}
+
+
+@app.get("/api/live/episodes/{episode_id}")
+async def get_live_episode(episode_id: str):
+    """
+    获取 episode 当前已写入的全部消息
+    """
+    return await _live_snapshot(_live_episode(episode_id))
+
+
+@app.get("/api/live/stream")
+async def stream_live_episodes(request: Request):
+    """
+    SSE：所有 episode 的摘要变化（event: episode）和移除（removed）
+    """
+    return _sse_response(request, None)
+
+
+@app.get("/api/live/episodes/{episode_id}/stream")
+async def stream_live_episode(episode_id: str, request: Request):
+    """
+    SSE：先推送 episode 快照（event: snapshot），之后推送新步骤（step）、任务（task）、结束（done）、
+    重置（reset）和移除（removed）事件
+    """
+    episode = _live_episode(episode_id)
+    tailer = _require_live_tailer()
+    # 先订阅再生成快照：已压缩的 episode 需要 await 读取文件，期间推送的事件由 _live_snapshot 处理
+    queue = tailer.subscribe(episode_id)
+    try:
+        initial = await _live_snapshot(episode, queue)
+    except BaseException:
+        tailer.unsubscribe(queue, episode_id)
+        raise
+    return _sse_response(request, episode_id, initial, queue)
+
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """
+    获取列表筛选缓存的命中、未命中和淘汰计数
+    """
+    return query_cache.stats()
 
 
 @app.get("/api/data-sources")
 async def get_data_sources():
     """
     获取已加载的数据源信息
+
+    validation 为每个数据源路径的加载时校验计数：
+    解析失败（按原因）、未知状态、空任务和缺失动作
     """
-    sources = {}
-    for traj in processed_trajectories:
-        source = traj['metadata'].get('source', 'unknown')
-        if source not in sources:
-            sources[source] = {
-                'count': 0,
-                'format': source,
-                'sample_id': traj['id']
-            }
-        sources[source]['count'] += 1
+    sources = summary_table.sources()
 
     return {
         'total_sources': len(sources),
-        'sources': list(sources.values())
+        'sources': sources,
+        'partial': not data_ready.is_set(),
+        'loading': [p.to_dict() for p in load_progress],
+        'validation': [
+            {'source': p.source, 'format': p.format, **p.validation.to_dict()}
+            for p in load_progress if p.validation is not None
+        ]
     }
 
 
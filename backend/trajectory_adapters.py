@@ -3,9 +3,24 @@ Trajectory Adapters - 支持多种轨迹数据格式
 提供统一的接口来处理不同来源的轨迹数据
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, IO
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import gzip
+import importlib.metadata
+import inspect
+import io
 import json
+import multiprocessing
+import os
+import re
+import time
+
+from trajectory_dedup import TrajectoryDeduplicator
+from trajectory_features import extract_features
+from trajectory_validation import ValidationReport
 
 # Check if HuggingFace datasets is available (without importing it yet)
 DATASETS_AVAILABLE = False
@@ -20,6 +35,17 @@ except (ImportError, AttributeError):
 if not DATASETS_AVAILABLE:
     print("Warning: HuggingFace datasets library not available. HuggingFace format will be disabled.")
 
+# zstandard 为可选依赖，仅读取 .zst 文件时需要
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+# 支持的压缩后缀
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+
 
 class Message:
     """统一的消息格式"""
@@ -54,6 +80,10 @@ class Trajectory:
         self.messages = messages
         self.environment = environment
         self.metadata = metadata or {}
+        # 加载时提取的行为特征（见 trajectory_features），不随 to_dict() 输出
+        self.features: Optional[Dict[str, Any]] = None
+        # 在原始数据中的序号（解析失败的记录也占序号），分片加载时用于重新编号
+        self.raw_index: Optional[int] = None
 
     def to_dict(self):
         return {
@@ -68,44 +98,297 @@ class Trajectory:
         }
 
 
+class LoadProgress:
+    """单个数据源的加载进度（由加载线程写入，API 线程读取）"""
+    def __init__(self, source: str, format_type: Optional[str] = None):
+        self.source = source
+        self.format = format_type
+        self.status = 'pending'  # 'pending', 'loading', 'done', 'failed'
+        self.bytes_total = 0
+        self.bytes_read = 0
+        self.items_parsed = 0
+        self.items_failed = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 加载时的校验计数，设为 None 可关闭校验
+        self.validation: Optional[ValidationReport] = ValidationReport()
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            'source': self.source,
+            'format': self.format,
+            'status': self.status,
+            'bytes_total': self.bytes_total,
+            'bytes_read': self.bytes_read,
+            'items_parsed': self.items_parsed,
+            'items_failed': self.items_failed,
+            'error': self.error,
+            'elapsed_seconds': elapsed
+        }
+
+
+def path_size(path: Path) -> int:
+    """文件大小，或目录下所有文件的总大小"""
+    if is_shard_pattern(path):
+        return sum(path_size(shard) for shard in expand_shards(path))
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+class _CountingReader(io.RawIOBase):
+    """统计已读取字节数的只读包装"""
+    def __init__(self, raw: IO[bytes], progress: Optional[LoadProgress]):
+        self._raw = raw
+        self._progress = progress
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        if n and self._progress is not None:
+            self._progress.bytes_read += n
+        return n
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+
+def split_compression(path: Path):
+    """
+    拆分数据后缀与压缩方式
+
+    例如 data.jsonl.zst -> ('.jsonl', 'zstd')，data.json -> ('.json', None)
+    """
+    compression = COMPRESSION_SUFFIXES.get(path.suffix)
+    if compression is None:
+        return path.suffix, None
+    return Path(path.stem).suffix, compression
+
+
+def open_text(path: Path, progress: Optional[LoadProgress] = None) -> IO[str]:
+    """
+    以文本方式打开数据文件（自动解压 .gz / .zst），并把读取的字节数记入 progress
+
+    统计的是磁盘上的（压缩后）字节数，与 path_size() 一致
+    """
+    _, compression = split_compression(path)
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard library is not available. Cannot read .zst files.")
+
+    raw = open(path, 'rb', buffering=0)
+    stream = io.BufferedReader(_CountingReader(raw, progress))
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    elif compression == 'zstd':
+        stream = zstandard.ZstdDecompressor().stream_reader(stream, closefd=True)
+    return io.TextIOWrapper(stream, encoding='utf-8')
+
+
+def is_shard_pattern(path: Path) -> bool:
+    """路径是否为分片通配符（如 data/rebel_*.jsonl.zst）"""
+    return glob.has_magic(str(path))
+
+
+def expand_shards(path: Path) -> List[Path]:
+    """展开分片通配符，按文件名排序以保证 ID 在多次加载间确定"""
+    if not is_shard_pattern(path):
+        return [path]
+    return sorted(Path(p) for p in glob.glob(str(path)))
+
+
+def source_exists(path: Path) -> bool:
+    """数据源是否存在（分片通配符至少匹配一个文件）"""
+    return bool(expand_shards(path)) if is_shard_pattern(path) else path.exists()
+
+
+# 第三方适配器通过该 entry point 组注册，值为 TrajectoryAdapter 子类
+ADAPTER_ENTRY_POINT_GROUP = 'trajectory_tracer.adapters'
+
+# 流式读取 JSON 时每次读取的字符数
+JSON_CHUNK_SIZE = 1 << 20
+
+_SEPARATOR_RE = re.compile(r'\s*[,\]]')
+
+
+def iter_jsonl(f: IO[str]) -> Iterator[Any]:
+    """逐行解析 JSON Lines，跳过空行"""
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_json_array(f: IO[str], chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐个解析顶层 JSON 数组中的元素
+
+    内存占用只取决于单个元素的大小，而不是整个文件
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # 跳过空白和分隔符
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            buffer = f.read(chunk_size)
+            pos = 0
+            eof = not buffer
+            continue
+
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError("Expected a top-level JSON array")
+            started = True
+            pos += 1
+            continue
+
+        if buffer[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = None
+
+        # 元素可能跨越了块边界（解析失败，或其后尚未读到分隔符），继续读取
+        if end is None or (not eof and not _SEPARATOR_RE.match(buffer, end)):
+            more = f.read(chunk_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+
+        yield item
+        pos = end
+        # 丢弃已解析的部分，避免缓冲区无限增长
+        if pos > chunk_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+
 class TrajectoryAdapter(ABC):
-    """轨迹适配器基类"""
+    """
+    轨迹适配器基类
+
+    子类需实现 iter_raw()（流式，推荐）或 load()（一次性加载）之一，以及 parse()。
+    下游统一通过 iter_parsed() 消费轨迹流，内存占用与数据集大小无关。
+    iter_raw() 可选地接受 progress 参数并把读取的字节数写入 progress.bytes_read；
+    只接受 path 的旧签名 iter_raw(self, path) 仍然兼容。
+    """
+
+    # 轨迹 ID 前缀，make_id() 生成 '{id_prefix}_{idx:05d}'
+    id_prefix = 'traj'
+
+    def detect(self, path: Path) -> bool:
+        """判断路径是否为该适配器支持的格式"""
+        return False
+
+    def make_id(self, idx: int) -> str:
+        """根据全局序号生成轨迹 ID（分片加载时用于跨分片重新编号）"""
+        return f"{self.id_prefix}_{idx:05d}"
+
+    def iter_raw(self, path: Path, progress: Optional[LoadProgress] = None) -> Iterator[Dict[str, Any]]:
+        """逐条产出原始数据"""
+        if type(self).load is TrajectoryAdapter.load:
+            raise NotImplementedError(f"{type(self).__name__} must implement iter_raw() or load()")
+        items = self.load(path)
+        if progress is not None:
+            progress.bytes_read = progress.bytes_total
+        yield from items
 
-    @abstractmethod
     def load(self, path: Path) -> List[Dict[str, Any]]:
         """加载原始数据"""
-        pass
+        return list(self.iter_raw(path))
 
     @abstractmethod
     def parse(self, raw_item: Dict[str, Any], idx: int) -> Trajectory:
         """将原始数据转换为统一的 Trajectory 格式"""
         pass
 
-    def load_and_parse(self, path: Path) -> List[Trajectory]:
-        """加载并解析所有轨迹"""
-        raw_data = self.load(path)
-        trajectories = []
-        for idx, item in enumerate(raw_data):
+    def _iter_raw_accepts_progress(self) -> bool:
+        """iter_raw() 是否接受 progress 参数（第三方适配器可能只实现了 iter_raw(self, path)）"""
+        try:
+            params = inspect.signature(self.iter_raw).parameters
+        except (TypeError, ValueError):
+            return False
+        return 'progress' in params or any(p.kind == p.VAR_KEYWORD for p in params.values())
+
+    def iter_parsed(self, path: Path, progress: Optional[LoadProgress] = None) -> Iterator[Trajectory]:
+        """逐条加载并解析轨迹，传入 progress 时同时累计校验计数"""
+        report = progress.validation if progress is not None else None
+        accepts_progress = self._iter_raw_accepts_progress()
+        if accepts_progress:
+            raw_items = self.iter_raw(path, progress=progress)
+        else:
+            raw_items = self.iter_raw(path)
+        for idx, item in enumerate(raw_items):
             try:
                 trajectory = self.parse(item, idx)
-                trajectories.append(trajectory)
+                trajectory.features = extract_features(trajectory)
+                trajectory.raw_index = idx
             except Exception as e:
                 print(f"Warning: Failed to parse trajectory {idx}: {e}")
-        return trajectories
+                if progress is not None:
+                    progress.items_failed += 1
+                if report is not None:
+                    report.record_failure(e)
+                continue
+            if progress is not None:
+                progress.items_parsed += 1
+            if report is not None:
+                report.record(trajectory)
+            yield trajectory
+
+        if progress is not None and not accepts_progress:
+            # 适配器不上报读取字节数，读完后直接记为全部读取
+            progress.bytes_read = progress.bytes_total
+
+    def load_and_parse(self, path: Path) -> List[Trajectory]:
+        """加载并解析所有轨迹"""
+        return list(self.iter_parsed(path))
 
 
 class HuggingFaceDatasetAdapter(TrajectoryAdapter):
     """HuggingFace datasets 格式适配器"""
 
-    def load(self, path: Path) -> List[Dict[str, Any]]:
-        """加载 HuggingFace dataset"""
+    id_prefix = 'hf_traj'
+
+    def detect(self, path: Path) -> bool:
+        """HuggingFace dataset 目录包含 dataset_info.json 和 state.json"""
+        return (DATASETS_AVAILABLE and path.is_dir()
+                and (path / 'dataset_info.json').exists() and (path / 'state.json').exists())
+
+    def iter_raw(self, path: Path, progress: Optional[LoadProgress] = None) -> Iterator[Dict[str, Any]]:
+        """逐条读取 HuggingFace dataset（Arrow 文件为内存映射，不会整体加载）"""
         if not DATASETS_AVAILABLE:
             raise RuntimeError("HuggingFace datasets library is not available. Cannot load this format.")
 
         # Import only when needed
         from datasets import load_from_disk
         dataset = load_from_disk(str(path))
-        return list(dataset)
+        total_rows = max(len(dataset), 1)
+        for idx, item in enumerate(dataset):
+            if progress is not None:
+                # 内存映射无法精确统计读取字节，按行数比例估算
+                progress.bytes_read = progress.bytes_total * (idx + 1) // total_rows
+            yield item
 
     def parse(self, raw_item: Dict[str, Any], idx: int) -> Trajectory:
         """解析 HuggingFace 格式的轨迹"""
@@ -159,7 +442,7 @@ class HuggingFaceDatasetAdapter(TrajectoryAdapter):
         steps = len([m for m in messages if m.role == 'agent' and m.action])
 
         return Trajectory(
-            id=f"hf_traj_{idx:05d}",
+            id=self.make_id(idx),
             task=task,
             status=status,
             steps=steps,
@@ -171,12 +454,98 @@ class HuggingFaceDatasetAdapter(TrajectoryAdapter):
 
 
 class REBELJSONAdapter(TrajectoryAdapter):
-    """REBEL JSON 格式适配器"""
+    """REBEL JSON 格式适配器（支持 .json / .jsonl 及其 .gz / .zst 压缩文件）"""
+
+    id_prefix = 'rebel_traj'
+
+    def detect(self, path: Path) -> bool:
+        """只读取第一条记录判断是否为 REBEL 格式"""
+        data_suffix, _ = split_compression(path)
+        if not (path.is_file() and data_suffix in ('.json', '.jsonl')):
+            return False
+        try:
+            first_item = next(self.iter_raw(path), None)
+        except Exception:
+            return False
+        return (isinstance(first_item, dict)
+                and 'task' in first_item and 'done' in first_item and 'data' in first_item)
+
+    def iter_raw(self, path: Path, progress: Optional[LoadProgress] = None) -> Iterator[Dict[str, Any]]:
+        """流式读取 JSON 数组或 JSON Lines"""
+        data_suffix, _ = split_compression(path)
+        with open_text(path, progress) as f:
+            if data_suffix == '.jsonl':
+                yield from iter_jsonl(f)
+            else:
+                yield from iter_json_array(f)
 
-    def load(self, path: Path) -> List[Dict[str, Any]]:
-        """加载 JSON 文件"""
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def parse_step(self, step_data: Dict[str, Any]) -> List[Message]:
+        """解析单个步骤：观察消息和 agent 响应消息（实时追踪也复用此方法）"""
+        messages = []
+        step_num = step_data.get('step', 0)
+        obs = step_data.get('obs', '')
+        response = step_data.get('response', '')
+
+        # 添加观察（环境反馈）
+        if obs:
+            messages.append(Message(
+                role='human',
+                content=obs,
+                metadata={'step': step_num, 'type': 'observation'}
+            ))
+
+        # 解析 agent 响应
+        if response:
+            thought = None
+            action = None
+            belief = None
+            reasoning = None
+
+            # 尝试解析结构化响应
+            if '<belief>' in response and '</belief>' in response:
+                belief_start = response.find('<belief>') + len('<belief>')
+                belief_end = response.find('</belief>')
+                belief = response[belief_start:belief_end].strip()
+
+            if '<reasoning>' in response and '</reasoning>' in response:
+                reasoning_start = response.find('<reasoning>') + len('<reasoning>')
+                reasoning_end = response.find('</reasoning>')
+                reasoning = response[reasoning_start:reasoning_end].strip()
+                thought = reasoning  # 使用 reasoning 作为 thought
+
+            if '<action>' in response and '</action>' in response:
+                action_start = response.find('<action>') + len('<action>')
+                action_end = response.find('</action>')
+                action = response[action_start:action_end].strip()
+
+            messages.append(Message(
+                role='agent',
+                content=response,
+                thought=thought,
+                action=action,
+                metadata={
+                    'step': step_num,
+                    'belief': belief,
+                    'type': 'agent_response'
+                }
+            ))
+
+        return messages
+
+    @staticmethod
+    def parse_task_type(task: str) -> str:
+        """任务描述的第一个词作为任务类型"""
+        if not task:
+            return 'unknown'
+        first_word = task.split()[0].lower()
+        if first_word in ['put', 'clean', 'heat', 'cool', 'find', 'examine', 'use']:
+            return first_word
+        return 'other'
+
+    @staticmethod
+    def parse_status(done: Any) -> str:
+        """done 字段转换为状态"""
+        return 'success' if done == 'True' else 'failed' if done == 'False' else 'unknown'
 
     def parse(self, raw_item: Dict[str, Any], idx: int) -> Trajectory:
         """解析 REBEL 格式的轨迹"""
@@ -188,65 +557,13 @@ class REBELJSONAdapter(TrajectoryAdapter):
 
         # 解析每个步骤
         for step_data in data:
-            step_num = step_data.get('step', 0)
-            obs = step_data.get('obs', '')
-            response = step_data.get('response', '')
-
-            # 添加观察（环境反馈）
-            if obs:
-                messages.append(Message(
-                    role='human',
-                    content=obs,
-                    metadata={'step': step_num, 'type': 'observation'}
-                ))
-
-            # 解析 agent 响应
-            if response:
-                thought = None
-                action = None
-                belief = None
-                reasoning = None
-
-                # 尝试解析结构化响应
-                if '<belief>' in response and '</belief>' in response:
-                    belief_start = response.find('<belief>') + len('<belief>')
-                    belief_end = response.find('</belief>')
-                    belief = response[belief_start:belief_end].strip()
-
-                if '<reasoning>' in response and '</reasoning>' in response:
-                    reasoning_start = response.find('<reasoning>') + len('<reasoning>')
-                    reasoning_end = response.find('</reasoning>')
-                    reasoning = response[reasoning_start:reasoning_end].strip()
-                    thought = reasoning  # 使用 reasoning 作为 thought
-
-                if '<action>' in response and '</action>' in response:
-                    action_start = response.find('<action>') + len('<action>')
-                    action_end = response.find('</action>')
-                    action = response[action_start:action_end].strip()
-
-                messages.append(Message(
-                    role='agent',
-                    content=response,
-                    thought=thought,
-                    action=action,
-                    metadata={
-                        'step': step_num,
-                        'belief': belief,
-                        'type': 'agent_response'
-                    }
-                ))
+            messages.extend(self.parse_step(step_data))
 
         # 提取任务类型
-        task_type = 'unknown'
-        if task:
-            first_word = task.split()[0].lower()
-            if first_word in ['put', 'clean', 'heat', 'cool', 'find', 'examine', 'use']:
-                task_type = first_word
-            else:
-                task_type = 'other'
+        task_type = self.parse_task_type(task)
 
         # 状态判断
-        status = 'success' if done == 'True' else 'failed' if done == 'False' else 'unknown'
+        status = self.parse_status(done)
 
         # 计算步数
         steps = len([m for m in messages if m.role == 'agent' and m.action])
@@ -261,7 +578,7 @@ class REBELJSONAdapter(TrajectoryAdapter):
                     environment = first_obs[:env_end].strip()
 
         return Trajectory(
-            id=f"rebel_traj_{idx:05d}",
+            id=self.make_id(idx),
             task=task,
             status=status,
             steps=steps,
@@ -272,52 +589,131 @@ class REBELJSONAdapter(TrajectoryAdapter):
         )
 
 
+def _parse_shard(adapter: TrajectoryAdapter, path: Path, validate: bool = True):
+    """在工作进程中解压并解析单个分片，返回 (轨迹列表, 解析失败数, 校验报告)"""
+    progress = LoadProgress(str(path))
+    if not validate:
+        progress.validation = None
+    trajectories = list(adapter.iter_parsed(path, progress))
+    return trajectories, progress.items_failed, progress.validation
+
+
 class TrajectoryLoader:
     """轨迹加载器 - 自动检测并使用合适的适配器"""
 
-    def __init__(self):
-        self.adapters = {
+    def __init__(self, deduplicate: bool = True, shard_workers: Optional[int] = None):
+        self.adapters: Dict[str, TrajectoryAdapter] = {
             'rebel_json': REBELJSONAdapter(),
         }
         # Only add HuggingFace adapter if datasets library is available
         if DATASETS_AVAILABLE:
             self.adapters['huggingface'] = HuggingFaceDatasetAdapter()
+        self.load_entry_point_adapters()
+        # 跨数据源共享的去重索引
+        self.deduplicator = TrajectoryDeduplicator() if deduplicate else None
+        # 并行解析分片的进程数
+        self.shard_workers = shard_workers or os.cpu_count() or 1
+
+    def register_adapter(self, format_type: str, adapter: TrajectoryAdapter):
+        """注册适配器（同名时覆盖）"""
+        self.adapters[format_type] = adapter
+
+    def load_entry_point_adapters(self):
+        """从已安装包的 entry point 中注册第三方适配器"""
+        for entry_point in importlib.metadata.entry_points(group=ADAPTER_ENTRY_POINT_GROUP):
+            try:
+                adapter_cls = entry_point.load()
+                self.register_adapter(entry_point.name, adapter_cls())
+                print(f"Registered adapter '{entry_point.name}' from {entry_point.value}")
+            except Exception as e:
+                print(f"Warning: Failed to register adapter '{entry_point.name}': {e}")
 
     def detect_format(self, path: Path) -> Optional[str]:
-        """自动检测轨迹格式"""
-        if path.is_dir():
-            # 检查是否是 HuggingFace dataset
-            if DATASETS_AVAILABLE and (path / 'dataset_info.json').exists() and (path / 'state.json').exists():
-                return 'huggingface'
-        elif path.is_file():
-            # 检查文件扩展名
-            if path.suffix == '.json':
-                # 尝试读取文件内容判断格式
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if isinstance(data, list) and len(data) > 0:
-                            first_item = data[0]
-                            # 检查是否是 REBEL 格式
-                            if 'task' in first_item and 'done' in first_item and 'data' in first_item:
-                                return 'rebel_json'
-                except Exception:
-                    pass
+        """自动检测轨迹格式（按注册顺序询问各适配器）"""
+        for format_type, adapter in self.adapters.items():
+            if adapter.detect(path):
+                return format_type
         return None
 
-    def load(self, path: Path, format_type: Optional[str] = None) -> List[Trajectory]:
+    def iter_shards(self, adapter: TrajectoryAdapter, shards: List[Path],
+                    progress: Optional[LoadProgress] = None) -> Iterator[Trajectory]:
         """
-        加载轨迹数据
+        并行解压并解析分片集合
+
+        分片在进程池中解析，但按文件名顺序产出，并用 adapter.make_id() 按原始记录的全局序号编号
+        （解析失败的记录同样占一个序号），因此 ID 与把所有分片拼接成单个文件时一致。
+        同时在途的分片数有上限，内存占用有界。
+        """
+        workers = min(self.shard_workers, len(shards))
+        # 之前各分片的原始记录数之和
+        offset = 0
+
+        def renumber(trajectories):
+            for trajectory in trajectories:
+                trajectory.id = adapter.make_id(offset + trajectory.raw_index)
+                yield trajectory
+
+        if workers <= 1:
+            for shard in shards:
+                # 分片的原始记录数 = 解析成功数 + 失败数
+                counter = progress
+                if counter is None:
+                    counter = LoadProgress(str(shard))
+                    counter.validation = None
+                before = counter.items_parsed + counter.items_failed
+                yield from renumber(adapter.iter_parsed(shard, counter))
+                offset += counter.items_parsed + counter.items_failed - before
+            return
+
+        validate = progress is not None and progress.validation is not None
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            remaining = iter(shards)
+            pending = deque()
+            for shard in remaining:
+                pending.append((shard, executor.submit(_parse_shard, adapter, shard, validate)))
+                if len(pending) >= workers * 2:
+                    break
+
+            while pending:
+                shard, future = pending.popleft()
+                trajectories, failed, report = future.result()
+                raw_count = len(trajectories) + failed
+                next_shard = next(remaining, None)
+                if next_shard is not None:
+                    pending.append((next_shard, executor.submit(_parse_shard, adapter, next_shard, validate)))
+
+                if progress is not None:
+                    progress.bytes_read += path_size(shard)
+                    progress.items_parsed += len(trajectories)
+                    progress.items_failed += failed
+                    if report is not None:
+                        progress.validation.merge(report)
+                yield from renumber(trajectories)
+                offset += raw_count
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_load(self, path: Path, format_type: Optional[str] = None,
+                  progress: Optional[LoadProgress] = None) -> Iterator[Trajectory]:
+        """
+        流式加载轨迹数据
 
         Args:
-            path: 数据路径
+            path: 数据路径，可以是分片通配符（如 data/rebel_*.jsonl.gz）
             format_type: 格式类型，如果为 None 则自动检测
+            progress: 可选的进度对象，加载过程中持续更新
 
-        Returns:
-            轨迹列表
+        Yields:
+            经过去重标记的轨迹
         """
+        shards = expand_shards(path) if is_shard_pattern(path) else None
+        if shards == []:
+            raise ValueError(f"No shards match pattern: {path}")
+
         if format_type is None:
-            format_type = self.detect_format(path)
+            # 分片集合以第一个分片的格式为准
+            format_type = self.detect_format(shards[0] if shards else path)
             if format_type is None:
                 raise ValueError(f"Cannot detect format for path: {path}")
 
@@ -326,10 +722,40 @@ class TrajectoryLoader:
 
         adapter = self.adapters[format_type]
         print(f"Loading trajectories from {path} using {format_type} adapter...")
-        trajectories = adapter.load_and_parse(path)
-        print(f"Loaded {len(trajectories)} trajectories")
+        if progress is not None:
+            progress.format = format_type
+            progress.bytes_total = path_size(path)
+
+        if shards is not None:
+            print(f"Found {len(shards)} shards")
+            stream = self.iter_shards(adapter, shards, progress)
+        else:
+            stream = adapter.iter_parsed(path, progress)
+
+        count = 0
+        duplicates = 0
+        for trajectory in stream:
+            if self.deduplicator is not None:
+                self.deduplicator.add(trajectory)
+                if trajectory.metadata['duplicate']:
+                    duplicates += 1
+            count += 1
+            yield trajectory
+
+        print(f"Loaded {count} trajectories ({duplicates} duplicates)")
+
+    def load(self, path: Path, format_type: Optional[str] = None) -> List[Trajectory]:
+        """
+        加载轨迹数据
+
+        Args:
+            path: 数据路径
+            format_type: 格式类型，如果为 None 则自动检测
 
-        return trajectories
+        Returns:
+            轨迹列表
+        """
+        return list(self.iter_load(path, format_type))
 
     def load_multiple(self, paths: List[Path]) -> List[Trajectory]:
         """加载多个数据源"""
@@ -0,0 +1,152 @@
+"""
+Trajectory Comparison - 同一任务下不同轨迹的动作序列比对
+按归一化任务文本分组，并用 Myers 差分算法对齐动作序列
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from trajectory_dedup import normalize_text
+
+
+def trajectory_actions(trajectory: Dict[str, Any]) -> List[str]:
+    """提取轨迹字典中 agent 的原始动作序列"""
+    return [
+        m['action'] for m in trajectory['messages']
+        if m['role'] == 'agent' and m['action']
+    ]
+
+
+def myers_matches(a: Sequence[Any], b: Sequence[Any]) -> List[Tuple[int, int]]:
+    """
+    Myers O((N+M)D) 差分，返回最长公共子序列中匹配元素的下标对 (i, j)
+
+    D 为编辑距离；同一任务的轨迹通常高度相似，D 很小。
+    每一轮只保存对角线 [-d, d] 上的切片用于回溯，内存为 O(D^2) 而不是 O((N+M)D)
+    """
+    n, m = len(a), len(b)
+    max_d = n + m
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        # trace[d][k + d] 为第 d 轮开始前对角线 k 上的最远 x
+        trace.append(v[offset - d:offset + d + 1])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, a, b, d)
+    return []
+
+
+def _backtrack(trace: List[List[int]], a: Sequence[Any], b: Sequence[Any], d: int) -> List[Tuple[int, int]]:
+    """从 Myers 的搜索轨迹回溯出匹配下标对"""
+    x, y = len(a), len(b)
+    matches = []
+    for depth in range(d, -1, -1):
+        v = trace[depth]
+        k = x - y
+        if depth == 0:
+            prev_k = 0
+            prev_x = 0
+        elif k == -depth or (k != depth and v[k - 1 + depth] < v[k + 1 + depth]):
+            prev_k = k + 1
+            prev_x = v[prev_k + depth]
+        else:
+            prev_k = k - 1
+            prev_x = v[prev_k + depth]
+        prev_y = prev_x - prev_k
+        if depth > 0:
+            # 对角线起点在编辑操作之后
+            start_x = prev_x if prev_k == k + 1 else prev_x + 1
+        else:
+            start_x = 0
+        start_y = start_x - k
+        while x > start_x and y > start_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    matches.reverse()
+    return matches
+
+
+def align_actions(actions_a: List[str], actions_b: List[str]) -> Dict[str, Any]:
+    """
+    对齐两条动作序列
+
+    Returns:
+        ops: 压缩后的差分操作（equal / delete / insert / replace），equal 段只给出区间
+        divergence: 第一个不一致的位置（两侧的动作下标），完全相同时为 None
+        similarity: 2 * 匹配数 / 总动作数
+    """
+    norm_a = [normalize_text(x) for x in actions_a]
+    norm_b = [normalize_text(x) for x in actions_b]
+    matches = myers_matches(norm_a, norm_b)
+
+    ops = []
+    i = j = 0
+    for mi, mj in matches + [(len(norm_a), len(norm_b))]:
+        if i < mi or j < mj:
+            op = 'replace' if i < mi and j < mj else 'delete' if i < mi else 'insert'
+            ops.append({
+                'op': op,
+                'a': [i, mi],
+                'b': [j, mj],
+                'actions_a': actions_a[i:mi],
+                'actions_b': actions_b[j:mj],
+            })
+        if mi < len(norm_a) and mj < len(norm_b):
+            if ops and ops[-1]['op'] == 'equal':
+                ops[-1]['a'][1] = mi + 1
+                ops[-1]['b'][1] = mj + 1
+            else:
+                ops.append({'op': 'equal', 'a': [mi, mi + 1], 'b': [mj, mj + 1]})
+        i, j = mi + 1, mj + 1
+
+    divergence = next(
+        ({'a': op['a'][0], 'b': op['b'][0]} for op in ops if op['op'] != 'equal'),
+        None
+    )
+    total = len(norm_a) + len(norm_b)
+    similarity = 2 * len(matches) / total if total else 1.0
+
+    return {
+        'ops': ops,
+        'divergence': divergence,
+        'matched': len(matches),
+        'similarity': round(similarity, 4),
+    }
+
+
+class TaskGroupIndex:
+    """归一化任务文本 -> 轨迹 ID 列表（加载时增量构建）"""
+
+    def __init__(self):
+        self.groups: Dict[str, List[str]] = {}
+        self.task_keys: Dict[str, str] = {}
+
+    def reset(self):
+        """清空索引"""
+        self.groups.clear()
+        self.task_keys.clear()
+
+    def add(self, trajectory: Dict[str, Any]):
+        """登记一条轨迹"""
+        key = normalize_text(trajectory['task'])
+        if not key:
+            return
+        self.task_keys[trajectory['id']] = key
+        self.groups.setdefault(key, []).append(trajectory['id'])
+
+    def group_of(self, trajectory_id: str) -> Optional[List[str]]:
+        """返回与该轨迹任务相同的所有轨迹 ID（包含自身）"""
+        key = self.task_keys.get(trajectory_id)
+        return self.groups.get(key) if key else None
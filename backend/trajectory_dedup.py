@@ -0,0 +1,146 @@
+"""
+Trajectory Deduplication - 加载时的轨迹去重
+对归一化后的任务文本和动作序列做精确哈希，并使用 MinHash/LSH 检测近似重复
+"""
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import random
+import re
+
+# MinHash 使用的梅森素数及哈希上界
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """归一化文本：小写、合并空白、去除结尾标点"""
+    if not text:
+        return ""
+    return _WHITESPACE_RE.sub(' ', text.lower()).strip().rstrip('.')
+
+
+def action_sequence(trajectory) -> List[str]:
+    """提取归一化后的 agent 动作序列"""
+    return [
+        normalize_text(m.action)
+        for m in trajectory.messages
+        if m.role == 'agent' and m.action
+    ]
+
+
+def _stable_hash(value: str) -> int:
+    """跨进程稳定的 64 位哈希（内置 hash() 会随机化）"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class TrajectoryDeduplicator:
+    """
+    增量式轨迹去重器
+
+    每条轨迹只与 LSH 桶中已有簇的代表比较，总开销随语料规模线性增长。
+    簇 ID 取簇中第一条轨迹的 ID，因此在相同加载顺序下是确定的。
+    """
+
+    def __init__(self, num_perm: int = 32, bands: int = 8, threshold: float = 0.8,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        self.reset()
+
+    def reset(self):
+        """清空所有索引（重新加载数据时调用）"""
+        self._exact: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[int, int], str] = {}
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self.cluster_sizes: Dict[str, int] = {}
+
+    def fingerprint(self, trajectory) -> str:
+        """任务文本 + 动作序列的精确指纹"""
+        payload = normalize_text(trajectory.task) + '\x1e' + '\x1f'.join(action_sequence(trajectory))
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def shingles(self, trajectory) -> List[int]:
+        """任务词 + 动作 n-gram 组成的特征集合"""
+        features = {'t:' + word for word in normalize_text(trajectory.task).split()}
+        actions = action_sequence(trajectory)
+        n = self.shingle_size
+        if len(actions) < n:
+            if actions:
+                features.add('a:' + '\x1f'.join(actions))
+        else:
+            for i in range(len(actions) - n + 1):
+                features.add('a:' + '\x1f'.join(actions[i:i + n]))
+        return [_stable_hash(f) for f in features]
+
+    def signature(self, shingles: List[int]) -> Tuple[int, ...]:
+        """计算 MinHash 签名"""
+        return tuple(
+            min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in shingles)
+            for a, b in self._perms
+        )
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """由签名估计 Jaccard 相似度"""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+    def add(self, trajectory) -> str:
+        """
+        将轨迹加入索引并返回其簇 ID
+
+        结果同时写入 trajectory.metadata：
+        content_hash、cluster_id、duplicate（'exact' / 'near' / None）
+        """
+        content_hash = self.fingerprint(trajectory)
+        trajectory.metadata['content_hash'] = content_hash
+
+        cluster_id = self._exact.get(content_hash)
+        duplicate = 'exact' if cluster_id else None
+
+        if cluster_id is None:
+            shingles = self.shingles(trajectory)
+            if shingles:
+                sig = self.signature(shingles)
+                band_keys = [
+                    (band, hash(sig[band * self.rows:(band + 1) * self.rows]))
+                    for band in range(self.bands)
+                ]
+                # 只与各桶中已有簇的代表比较，保证线性开销
+                for key in band_keys:
+                    candidate = self._buckets.get(key)
+                    if candidate and self.similarity(sig, self._signatures[candidate]) >= self.threshold:
+                        cluster_id = candidate
+                        duplicate = 'near'
+                        break
+
+                if cluster_id is None:
+                    cluster_id = trajectory.id
+                    self._signatures[cluster_id] = sig
+                    for key in band_keys:
+                        self._buckets.setdefault(key, cluster_id)
+            else:
+                cluster_id = trajectory.id
+
+            self._exact[content_hash] = cluster_id
+
+        self.cluster_sizes[cluster_id] = self.cluster_sizes.get(cluster_id, 0) + 1
+        trajectory.metadata['cluster_id'] = cluster_id
+        trajectory.metadata['duplicate'] = duplicate
+        return cluster_id
+
+    def cluster_size(self, cluster_id: Optional[str]) -> int:
+        """返回簇的大小"""
+        return self.cluster_sizes.get(cluster_id, 1) if cluster_id else 1
@@ -0,0 +1,62 @@
+"""
+Trajectory Features - 加载时提取的轨迹行为特征
+动作动词直方图、重复动作/循环得分、访问过的不同位置数
+"""
+from typing import Any, Dict, List
+import re
+
+from trajectory_dedup import normalize_text
+
+# ALFWorld 动作动词，其余动词计入 'other'
+ACTION_VERBS = [
+    'go', 'take', 'put', 'open', 'close', 'toggle', 'clean', 'heat', 'cool',
+    'use', 'slice', 'examine', 'look', 'inventory', 'think', 'other',
+]
+VERB_INDEX = {verb: i for i, verb in enumerate(ACTION_VERBS)}
+
+# 第一个词以空白或冒号结束（think 动作形如 "think: ..."）
+_VERB_RE = re.compile(r'[^\s:]+')
+
+
+def action_verb(action: str) -> str:
+    """动作的动词（第一个词）"""
+    match = _VERB_RE.match(action.lstrip())
+    verb = match.group(0) if match else ''
+    return verb if verb in VERB_INDEX else 'other'
+
+
+def extract_features(trajectory) -> Dict[str, Any]:
+    """
+    提取行为特征
+
+    Returns:
+        verb_counts: 与 ACTION_VERBS 对齐的动词计数
+        loop_score: 与前一个或前两个动作相同的动作占比（原地重复或在两处来回），范围 [0, 1]
+        unique_locations: "go to X" 中不同 X 的个数
+    """
+    actions = [
+        normalize_text(m.action)
+        for m in trajectory.messages
+        if m.role == 'agent' and m.action
+    ]
+
+    verb_counts: List[int] = [0] * len(ACTION_VERBS)
+    locations = set()
+    repeats = 0
+    for i, action in enumerate(actions):
+        verb_counts[VERB_INDEX[action_verb(action)]] += 1
+        if action.startswith('go to '):
+            locations.add(action[len('go to '):])
+        if (i >= 1 and action == actions[i - 1]) or (i >= 2 and action == actions[i - 2]):
+            repeats += 1
+
+    return {
+        'verb_counts': verb_counts,
+        'loop_score': round(repeats / len(actions), 4) if actions else 0.0,
+        'unique_locations': len(locations),
+    }
+
+
+def verb_histogram(verb_counts) -> Dict[str, int]:
+    """把计数数组转换为 {动词: 次数}，省略为 0 的动词"""
+    return {ACTION_VERBS[i]: int(count) for i, count in enumerate(verb_counts) if count}
@@ -0,0 +1,416 @@
+"""
+Trajectory Summary Table - 列式轨迹摘要表
+加载时把列表/统计接口用到的字段存成 NumPy 列，查询时用向量化掩码和 bincount 代替逐行遍历
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import random
+import threading
+
+import numpy as np
+
+from trajectory_features import ACTION_VERBS, VERB_INDEX, verb_histogram
+
+
+class CategoryColumn:
+    """类别列：字符串值 -> 整数编码"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: str) -> int:
+        """返回值的编码，新值自动分配编码"""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """查询已有值的编码，不存在时返回 -1"""
+        return self.codes.get(value, -1)
+
+
+class SummaryTable:
+    """
+    轨迹摘要表
+
+    第 i 行对应 processed_trajectories[i]。数据由加载线程追加，API 线程通过 snapshot() 读取一致的视图，
+    列数组按倍增扩容，追加的均摊开销为 O(1)。
+    """
+
+    # 数值列及其 dtype
+    NUMERIC_COLUMNS = {
+        'steps': np.int32,
+        'status': np.int16,
+        'task_type': np.int16,
+        'source': np.int16,
+        'cluster': np.int32,
+        'representative': np.bool_,
+        'loop_score': np.float32,
+        'unique_locations': np.int16,
+    }
+    # 可排序的列
+    SORT_COLUMNS = ('steps', 'loop_score', 'unique_locations', 'verb_count')
+    # 类别列（以编码存储）
+    CATEGORY_COLUMNS = ('status', 'task_type', 'source', 'cluster')
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self.size = 0
+        # reset() 时递增，与 size 一起构成数据版本
+        self.generation = 0
+        self.ids = np.empty(capacity, dtype=object)
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.NUMERIC_COLUMNS.items()}
+        # 动作动词直方图，每行一个与 ACTION_VERBS 对齐的计数向量
+        self.columns['verbs'] = np.zeros((capacity, len(ACTION_VERBS)), dtype=np.uint16)
+        self.categories = {name: CategoryColumn() for name in self.CATEGORY_COLUMNS}
+        # 每个数据源的第一行，用于 sample_id
+        self.first_row_by_source: Dict[int, int] = {}
+        # (task_type 编码, status 编码) -> 行号列表，用于 O(样本量) 的分层抽样
+        self.strata: Dict[Tuple[int, int], List[int]] = {}
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """数据版本：表只追加，因此 (generation, size) 不变即数据不变"""
+        return self.generation, self.size
+
+    def reset(self):
+        """清空所有行（重新加载数据时调用）"""
+        with self._lock:
+            self.size = 0
+            self.generation += 1
+            self.categories = {name: CategoryColumn() for name in self.CATEGORY_COLUMNS}
+            self.first_row_by_source = {}
+            self.strata = {}
+
+    def _grow(self):
+        """容量翻倍"""
+        capacity = len(self.ids) * 2
+        ids = np.empty(capacity, dtype=object)
+        ids[:self.size] = self.ids[:self.size]
+        self.ids = ids
+        for name, column in self.columns.items():
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, trajectory: Dict[str, Any], features: Optional[Dict[str, Any]] = None):
+        """追加一条轨迹字典及其行为特征"""
+        metadata = trajectory['metadata']
+        cluster_id = metadata.get('cluster_id') or trajectory['id']
+        with self._lock:
+            if self.size == len(self.ids):
+                self._grow()
+            row = self.size
+            source = self.categories['source'].encode(metadata.get('source', 'unknown'))
+            self.first_row_by_source.setdefault(source, row)
+
+            status = self.categories['status'].encode(trajectory['status'])
+            task_type = self.categories['task_type'].encode(trajectory['task_type'])
+            self.strata.setdefault((task_type, status), []).append(row)
+
+            self.ids[row] = trajectory['id']
+            self.columns['steps'][row] = trajectory['steps']
+            self.columns['status'][row] = status
+            self.columns['task_type'][row] = task_type
+            self.columns['source'][row] = source
+            self.columns['cluster'][row] = self.categories['cluster'].encode(cluster_id)
+            self.columns['representative'][row] = cluster_id == trajectory['id']
+            if features:
+                self.columns['loop_score'][row] = features['loop_score']
+                self.columns['unique_locations'][row] = features['unique_locations']
+                self.columns['verbs'][row] = features['verb_counts']
+            else:
+                self.columns['loop_score'][row] = 0
+                self.columns['unique_locations'][row] = 0
+                self.columns['verbs'][row] = 0
+            self.size = row + 1
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """当前已加载行的一致视图"""
+        with self._lock:
+            n = self.size
+            view = {name: column[:n] for name, column in self.columns.items()}
+            view['ids'] = self.ids[:n]
+        return view
+
+    def features(self, row: int) -> Dict[str, Any]:
+        """某一行的行为特征"""
+        return {
+            'loop_score': round(float(self.columns['loop_score'][row]), 4),
+            'unique_locations': int(self.columns['unique_locations'][row]),
+            'verb_counts': verb_histogram(self.columns['verbs'][row]),
+        }
+
+    def filter(self, status: Optional[str] = None, task_type: Optional[str] = None,
+               min_steps: Optional[int] = None, max_steps: Optional[int] = None,
+               cluster_id: Optional[str] = None, unique_only: bool = False,
+               min_loop_score: Optional[float] = None, max_loop_score: Optional[float] = None,
+               min_unique_locations: Optional[int] = None, max_unique_locations: Optional[int] = None,
+               verb: Optional[str] = None, min_verb_count: Optional[int] = None,
+               sort_by: Optional[str] = None, descending: bool = False) -> np.ndarray:
+        """
+        返回满足所有条件的行号
+
+        未指定 sort_by 时按加载顺序；sort_by='verb_count' 时按 verb 指定动词的次数排序。
+        排序是稳定的，同值行保持加载顺序。
+        """
+        view = self.snapshot()
+        mask = np.ones(len(view['ids']), dtype=np.bool_)
+
+        for name, value in (('status', status), ('task_type', task_type), ('cluster', cluster_id)):
+            if value:
+                mask &= view[name] == self.categories[name].lookup(value)
+
+        if min_steps is not None:
+            mask &= view['steps'] >= min_steps
+        if max_steps is not None:
+            mask &= view['steps'] <= max_steps
+        if unique_only:
+            mask &= view['representative']
+
+        for name, low, high in (('loop_score', min_loop_score, max_loop_score),
+                                ('unique_locations', min_unique_locations, max_unique_locations)):
+            if low is not None:
+                mask &= view[name] >= low
+            if high is not None:
+                mask &= view[name] <= high
+
+        verb_column = view['verbs'][:, VERB_INDEX[verb]] if verb in VERB_INDEX else None
+        if min_verb_count is not None:
+            if verb_column is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= verb_column >= min_verb_count
+
+        rows = np.flatnonzero(mask)
+        if sort_by:
+            if sort_by == 'verb_count':
+                if verb_column is None:
+                    raise ValueError("sort_by=verb_count requires a known verb")
+                keys = verb_column[rows]
+            else:
+                keys = view[sort_by][rows]
+            if descending:
+                # 取负后做稳定排序，同值行仍按加载顺序
+                keys = -keys.astype(np.float64)
+            rows = rows[np.argsort(keys, kind='stable')]
+        return rows
+
+    def counts(self, name: str, view: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, int]:
+        """类别列各取值的行数"""
+        view = view or self.snapshot()
+        values = self.categories[name].values
+        counts = np.bincount(view[name], minlength=len(values))
+        return {values[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def statistics(self) -> Dict[str, Any]:
+        """列表统计信息"""
+        view = self.snapshot()
+        total = len(view['ids'])
+        unique_clusters = int(np.count_nonzero(view['representative']))
+        return {
+            "total": total,
+            "by_status": self.counts('status', view),
+            "by_task_type": self.counts('task_type', view),
+            "by_source": self.counts('source', view),
+            "avg_steps": round(float(view['steps'].mean()), 2) if total else 0,
+            "unique_clusters": unique_clusters,
+            "duplicates": total - unique_clusters
+        }
+
+    def sample(self, size: int, rng: random.Random, stratify_by: Tuple[str, ...] = (),
+               allocation: str = 'proportional', status: Optional[str] = None,
+               task_type: Optional[str] = None) -> Tuple[List[int], List[Dict[str, Any]]]:
+        """
+        随机抽样
+
+        直接在预先维护的分层行号列表上抽样，开销为 O(样本量 + 分层数)，与总行数无关。
+
+        Args:
+            size: 样本量
+            rng: 随机数生成器（固定种子即可复现）
+            stratify_by: 分层字段，'task_type' 和/或 'status'；为空时均匀抽样
+            allocation: 'proportional' 按层大小比例分配样本，'equal' 每层尽量相同
+            status / task_type: 只在匹配的行中抽样
+
+        Returns:
+            (行号列表, 每层的总体数和抽样数)
+        """
+        with self._lock:
+            fine_strata = [(key, rows, len(rows)) for key, rows in self.strata.items()]
+            task_types = list(self.categories['task_type'].values)
+            statuses = list(self.categories['status'].values)
+
+        # 按筛选条件挑出细分层，再按 stratify_by 合并为抽样层
+        groups: Dict[Tuple[str, ...], List[Tuple[List[int], int]]] = {}
+        for (task_type_code, status_code), rows, count in fine_strata:
+            labels = {'task_type': task_types[task_type_code], 'status': statuses[status_code]}
+            if (task_type and labels['task_type'] != task_type) or (status and labels['status'] != status):
+                continue
+            group_key = tuple(labels[name] for name in stratify_by)
+            groups.setdefault(group_key, []).append((rows, count))
+
+        group_keys = sorted(groups)
+        populations = [sum(count for _, count in groups[key]) for key in group_keys]
+        quotas = _allocate(size, populations, allocation)
+
+        sampled_rows: List[int] = []
+        report = []
+        for key, population, quota in zip(group_keys, populations, quotas):
+            sampled_rows.extend(_sample_lists(groups[key], quota, rng))
+            entry = dict(zip(stratify_by, key))
+            entry.update(population=population, sampled=quota)
+            report.append(entry)
+        return sampled_rows, report
+
+    def sources(self) -> List[Dict[str, Any]]:
+        """每个数据源的行数和示例 ID"""
+        view = self.snapshot()
+        counts = np.bincount(view['source'], minlength=len(self.categories['source'].values))
+        return [
+            {
+                'count': int(counts[code]),
+                'format': source,
+                'sample_id': view['ids'][self.first_row_by_source[code]]
+            }
+            for code, source in enumerate(self.categories['source'].values)
+            if code < len(counts) and counts[code]
+        ]
+
+
+def _allocate(size: int, populations: List[int], allocation: str) -> List[int]:
+    """把样本量分配到各层，每层不超过其总体数"""
+    total = sum(populations)
+    if size >= total:
+        return list(populations)
+
+    if allocation == 'equal':
+        quotas = [0] * len(populations)
+        remaining = size
+        open_strata = [i for i, population in enumerate(populations) if population]
+        # 平均分配，装满的层把余量让给其他层
+        while remaining and open_strata:
+            share = max(remaining // len(open_strata), 1)
+            for i in list(open_strata):
+                take = min(share, populations[i] - quotas[i], remaining)
+                quotas[i] += take
+                remaining -= take
+                if quotas[i] == populations[i]:
+                    open_strata.remove(i)
+                if not remaining:
+                    break
+        return quotas
+
+    # 按比例分配，余数按最大余数法补齐
+    exact = [size * population / total for population in populations]
+    quotas = [int(x) for x in exact]
+    by_remainder = sorted(range(len(populations)), key=lambda i: (quotas[i] - exact[i], i))
+    for i in by_remainder[:size - sum(quotas)]:
+        quotas[i] += 1
+    return quotas
+
+
+def _sample_lists(lists: List[Tuple[List[int], int]], k: int, rng: random.Random) -> List[int]:
+    """在若干行号列表（只取各自前 count 个）的拼接上无放回抽取 k 个，不实际拼接"""
+    counts = [count for _, count in lists]
+    offsets = list(accumulate(counts))
+    picked = []
+    for position in rng.sample(range(offsets[-1] if offsets else 0), k):
+        i = bisect_right(offsets, position)
+        start = offsets[i - 1] if i else 0
+        picked.append(lists[i][0][position - start])
+    return picked
+
+
+def normalize_filters(**filters) -> Tuple:
+    """
+    把 SummaryTable.filter() 的参数归一化为缓存键，等价条件映射到同一个键
+
+    返回按参数名排序的 (name, value) 元组，可用 dict(key) 还原为参数
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or value is False or value == '':
+            continue
+        # 下限为 0 不筛选任何行
+        if name.startswith('min_') and value == 0:
+            continue
+        normalized[name] = value
+    # 升序是默认值；未排序时方向无意义
+    if not normalized.get('sort_by'):
+        normalized.pop('descending', None)
+    return tuple(sorted(normalized.items()))
+
+
+class FilterResultCache:
+    """
+    筛选结果的 LRU 缓存
+
+    键为归一化后的筛选条件，值为匹配的行号数组；同一筛选条件的所有分页共用一份结果。
+    数据版本变化时整体失效。
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._version: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: Tuple, version: Tuple[int, int],
+                       compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """命中时返回缓存的行号，否则调用 compute() 并缓存"""
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+
+            rows = self._entries.get(key)
+            if rows is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rows
+            self.misses += 1
+
+        rows = compute()
+
+        with self._lock:
+            # 计算期间数据版本可能已变化，此时结果不再缓存
+            if version == self._version:
+                self._entries[key] = rows
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return rows
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self) -> Dict[str, Any]:
+        """命中率等计数器"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "cached_rows": int(sum(len(rows) for rows in self._entries.values())),
+            }
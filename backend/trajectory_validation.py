@@ -0,0 +1,90 @@
+"""
+Trajectory Validation - 加载时的数据校验报告
+随解析逐条累计每个数据源的计数：解析失败原因、未知状态、空任务和缺失动作
+"""
+from typing import Any, Dict
+
+# 每类问题最多保留的不同取值数，避免异常数据撑大报告
+MAX_DISTINCT_VALUES = 20
+
+
+class ValidationReport:
+    """
+    单个数据源的校验计数
+
+    record() 只读取解析时已经算好的字段（status、steps、task），
+    每条轨迹只多一次消息遍历，开销相对解析本身可以忽略。
+    """
+
+    def __init__(self):
+        self.checked = 0
+        self.parse_failures = 0
+        self.failure_reasons: Dict[str, int] = {}
+        self.failure_examples: Dict[str, str] = {}
+        self.unknown_statuses = 0
+        self.unknown_status_values: Dict[str, int] = {}
+        self.empty_tasks = 0
+        self.missing_actions = 0  # 没有任何动作的轨迹
+        self.agent_messages_without_action = 0
+
+    def record(self, trajectory):
+        """登记一条解析成功的轨迹"""
+        self.checked += 1
+
+        if trajectory.status == 'unknown':
+            self.unknown_statuses += 1
+            # REBEL 的原始 done 字段；HuggingFace 没有该字段，只计数
+            if 'done' in trajectory.metadata:
+                _count_value(self.unknown_status_values, repr(trajectory.metadata['done']))
+
+        if not trajectory.task or trajectory.task.isspace():
+            self.empty_tasks += 1
+
+        if not trajectory.steps:
+            self.missing_actions += 1
+
+        agent_messages = sum(1 for m in trajectory.messages if m.role == 'agent')
+        self.agent_messages_without_action += agent_messages - trajectory.steps
+
+    def record_failure(self, error: Exception):
+        """登记一条解析失败的原始数据，原因按异常类型归类"""
+        self.parse_failures += 1
+        reason = type(error).__name__
+        if _count_value(self.failure_reasons, reason) and reason not in self.failure_examples:
+            self.failure_examples[reason] = str(error)[:200]
+
+    def merge(self, other: 'ValidationReport'):
+        """合并另一个报告（并行解析分片时使用）"""
+        self.checked += other.checked
+        self.parse_failures += other.parse_failures
+        for reason, count in other.failure_reasons.items():
+            if _count_value(self.failure_reasons, reason, count):
+                self.failure_examples.setdefault(reason, other.failure_examples.get(reason, ''))
+        self.unknown_statuses += other.unknown_statuses
+        for value, count in other.unknown_status_values.items():
+            _count_value(self.unknown_status_values, value, count)
+        self.empty_tasks += other.empty_tasks
+        self.missing_actions += other.missing_actions
+        self.agent_messages_without_action += other.agent_messages_without_action
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'checked': self.checked,
+            'parse_failures': self.parse_failures,
+            'failure_reasons': dict(self.failure_reasons),
+            'failure_examples': dict(self.failure_examples),
+            'unknown_statuses': self.unknown_statuses,
+            'unknown_status_values': dict(self.unknown_status_values),
+            'empty_tasks': self.empty_tasks,
+            'missing_actions': self.missing_actions,
+            'agent_messages_without_action': self.agent_messages_without_action
+        }
+
+
+def _count_value(counts: Dict[str, int], value: str, amount: int = 1) -> bool:
+    """累加取值计数；超过 MAX_DISTINCT_VALUES 的新取值计入 '<other>'，返回是否按原值计数"""
+    if value not in counts and len(counts) >= MAX_DISTINCT_VALUES:
+        counts['<other>'] = counts.get('<other>', 0) + amount
+        return False
+    counts[value] = counts.get(value, 0) + amount
+    return True
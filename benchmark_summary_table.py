@@ -0,0 +1,117 @@
+"""
+列式摘要表基准测试
+比较逐行遍历字典列表与 SummaryTable 向量化查询的单次请求耗时
+
+用法: python benchmark_summary_table.py [行数 ...]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_table import SummaryTable
+
+STATUSES = ['success', 'failed', 'unknown']
+TASK_TYPES = ['put', 'clean', 'heat', 'cool', 'find', 'examine', 'use', 'other']
+SOURCES = ['huggingface', 'rebel']
+
+
+def make_rows(n, seed=0):
+    """生成只包含摘要字段的合成轨迹字典"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        traj_id = f"traj_{i:07d}"
+        rows.append({
+            'id': traj_id,
+            'task': 'put some cellphone on sidetable.',
+            'status': rng.choice(STATUSES),
+            'steps': rng.randint(1, 50),
+            'task_type': rng.choice(TASK_TYPES),
+            'metadata': {'source': rng.choice(SOURCES), 'cluster_id': traj_id},
+        })
+    return rows
+
+
+def list_filter(rows, status, task_type, min_steps, max_steps, skip, limit):
+    """原 get_trajectories 的逐行筛选"""
+    filtered = rows
+    filtered = [t for t in filtered if t['status'] == status]
+    filtered = [t for t in filtered if t['task_type'] == task_type]
+    filtered = [t for t in filtered if t['steps'] >= min_steps]
+    filtered = [t for t in filtered if t['steps'] <= max_steps]
+    return filtered[skip:skip + limit]
+
+
+def list_statistics(rows):
+    """原 get_statistics 的逐行统计"""
+    by_status, by_task_type, by_source = {}, {}, {}
+    for t in rows:
+        by_status[t['status']] = by_status.get(t['status'], 0) + 1
+    for t in rows:
+        by_task_type[t['task_type']] = by_task_type.get(t['task_type'], 0) + 1
+    for t in rows:
+        source = t['metadata'].get('source', 'unknown')
+        by_source[source] = by_source.get(source, 0) + 1
+    avg_steps = sum(t['steps'] for t in rows) / len(rows)
+    return by_status, by_task_type, by_source, avg_steps
+
+
+def list_sources(rows):
+    """原 get_data_sources 的逐行统计"""
+    sources = {}
+    for traj in rows:
+        source = traj['metadata'].get('source', 'unknown')
+        if source not in sources:
+            sources[source] = {'count': 0, 'format': source, 'sample_id': traj['id']}
+        sources[source]['count'] += 1
+    return list(sources.values())
+
+
+def table_filter(table, rows, status, task_type, min_steps, max_steps, skip, limit):
+    """SummaryTable 向量化筛选"""
+    matched = table.filter(status=status, task_type=task_type, min_steps=min_steps, max_steps=max_steps)
+    return [rows[i] for i in matched[skip:skip + limit]]
+
+
+def best_of(func, repeat=5):
+    """多次运行取最短耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(n):
+    rows = make_rows(n)
+    table = SummaryTable()
+    start = time.perf_counter()
+    for row in rows:
+        table.append(row)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    query = ('failed', 'heat', 5, 30, 100, 50)
+    assert list_filter(rows, *query) == table_filter(table, rows, *query)
+    assert list_sources(rows) == table.sources()
+
+    results = [
+        ('list', best_of(lambda: list_filter(rows, *query)), best_of(lambda: table_filter(table, rows, *query))),
+        ('statistics', best_of(lambda: list_statistics(rows)), best_of(table.statistics)),
+        ('data-sources', best_of(lambda: list_sources(rows)), best_of(table.sources)),
+    ]
+
+    print(f"\n{n:,} rows (table build: {build_ms:.0f} ms)")
+    print(f"  {'endpoint':<14}{'dict rows':>12}{'columnar':>12}{'speedup':>10}")
+    for name, before, after in results:
+        print(f"  {name:<14}{before:>10.2f}ms{after:>10.2f}ms{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        run(size)
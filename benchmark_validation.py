@@ -0,0 +1,104 @@
+"""
+加载时校验基准测试
+比较开启和关闭 ValidationReport 时解析同一个 REBEL 文件的耗时，校验开销应低于 5%
+
+用法: python benchmark_validation.py [轨迹数 ...]
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_adapters import LoadProgress, REBELJSONAdapter
+from trajectory_validation import ValidationReport
+
+TASKS = ['put some cellphone on sidetable.', 'heat some egg and put it in garbagecan.',
+         'clean some soapbar and put it in toilet.', '']
+DONE_VALUES = ['True', 'False', 'False', 'None']
+# 允许的校验开销
+MAX_OVERHEAD = 0.05
+
+
+def make_item(rng):
+    """生成一条合成 REBEL 轨迹，少量轨迹带有空任务、未知状态或缺失动作"""
+    task = rng.choice(TASKS)
+    steps = []
+    for step in range(rng.randint(5, 30)):
+        action = rng.choice(['go to cabinet 1', 'open drawer 2', 'take pen 1 from desk 1', ''])
+        steps.append({
+            'step': step,
+            'obs': f"You arrive at cabinet {step}. On the cabinet {step}, you see a pen 1.",
+            'response': (f"<belief>the pen may be in cabinet {step}</belief>"
+                         f"<reasoning>check the next location</reasoning><action>{action}</action>")
+        })
+    return {'task': task, 'done': rng.choice(DONE_VALUES), 'data': steps}
+
+
+def write_corpus(path, n, seed=0):
+    rng = random.Random(seed)
+    items = [make_item(rng) for _ in range(n)]
+    # 少量无法解析的记录
+    for i in range(0, n, max(n // 5, 1)):
+        items[i] = {'task': 'broken', 'data': 'not a list'}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(items, f)
+
+
+def parse_time(adapter, path, validate):
+    """完整解析一遍文件的耗时（秒），返回 (耗时, 进度对象)"""
+    progress = LoadProgress(str(path))
+    if not validate:
+        progress.validation = None
+    start = time.perf_counter()
+    for _ in adapter.iter_parsed(path, progress):
+        pass
+    return time.perf_counter() - start, progress
+
+
+def record_time(trajectories):
+    """只对已解析的轨迹执行 ValidationReport.record() 的耗时（秒）"""
+    report = ValidationReport()
+    start = time.perf_counter()
+    for trajectory in trajectories:
+        report.record(trajectory)
+    return time.perf_counter() - start
+
+
+def run(n, repeat=3):
+    adapter = REBELJSONAdapter()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'rebel_bench.json'
+        write_corpus(path, n)
+
+        # 交替运行，减少缓存和频率波动带来的偏差
+        base, checked = float('inf'), float('inf')
+        progress = None
+        for _ in range(repeat):
+            base = min(base, parse_time(adapter, path, False)[0])
+            elapsed, progress = parse_time(adapter, path, True)
+            checked = min(checked, elapsed)
+        trajectories = list(adapter.iter_parsed(path))
+
+    # 整体耗时的波动通常大于校验本身的开销，因此另外单独测量 record() 的耗时
+    isolated = min(record_time(trajectories) for _ in range(repeat))
+    overhead = isolated / base
+    report = progress.validation.to_dict()
+    print(f"\n{n:,} trajectories")
+    print(f"  without validation: {base * 1000:>9.0f} ms")
+    print(f"  with validation:    {checked * 1000:>9.0f} ms  ({(checked / base - 1) * 100:+.2f} %, includes noise)")
+    print(f"  record() only:      {isolated * 1000:>9.1f} ms  "
+          f"({overhead * 100:.2f} % of load time, budget {MAX_OVERHEAD * 100:.0f} %)")
+    print(f"  report: parse_failures={report['parse_failures']} unknown_statuses={report['unknown_statuses']} "
+          f"empty_tasks={report['empty_tasks']} missing_actions={report['missing_actions']}")
+    return overhead
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000]
+    overheads = [run(size) for size in sizes]
+    sys.exit(0 if max(overheads) < MAX_OVERHEAD else 1)
@@ -0,0 +1,86 @@
+"""
+测试轨迹比对
+验证 Myers 对齐结果是最长公共子序列，且差分能还原两条动作序列
+"""
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from trajectory_compare import align_actions, myers_matches
+
+
+def lcs_length(a, b):
+    """动态规划求最长公共子序列长度"""
+    dp = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) - 1, -1, -1):
+        for j in range(len(b) - 1, -1, -1):
+            dp[i][j] = dp[i + 1][j + 1] + 1 if a[i] == b[j] else max(dp[i + 1][j], dp[i][j + 1])
+    return dp[0][0]
+
+
+def test_myers_matches():
+    """随机序列上与动态规划结果比较"""
+    rng = random.Random(0)
+    for _ in range(500):
+        a = [rng.randint(0, 3) for _ in range(rng.randint(0, 12))]
+        b = [rng.randint(0, 3) for _ in range(rng.randint(0, 12))]
+        matches = myers_matches(a, b)
+        assert len(matches) == lcs_length(a, b)
+        assert all(a[i] == b[j] for i, j in matches)
+    print("[OK] Myers matches test passed!")
+
+
+def test_align_actions():
+    """测试差分操作和分歧点"""
+    expert = ['go to desk 1', 'take pen 1 from desk 1', 'go to shelf 1', 'put pen 1 in/on shelf 1']
+    agent = ['go to desk 1', 'Take pen 1 from desk 1.', 'go to drawer 1', 'go to shelf 1', 'put pen 1 in/on shelf 1']
+    result = align_actions(expert, agent)
+
+    assert result['divergence'] == {'a': 2, 'b': 2}
+    assert result['matched'] == 4
+    assert [op['op'] for op in result['ops']] == ['equal', 'insert', 'equal']
+    assert result['ops'][1]['actions_b'] == ['go to drawer 1']
+    assert align_actions(expert, expert)['divergence'] is None
+    print("[OK] Align actions test passed!")
+
+
+def test_compare_endpoints(monkeypatch):
+    """同任务比对最多对齐 COMPARE_MAX_MEMBERS 条，两条轨迹的差分接口正常返回"""
+    items = [{'task': 'put some apple on sidetable.', 'done': 'True',
+              'data': [{'step': s, 'obs': 'obs', 'response': f'<action>go to shelf {s * i}</action>'}
+                       for s in range(3)]} for i in range(5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'rebel.json'
+        path.write_text(json.dumps(items), encoding='utf-8')
+        monkeypatch.setattr(main, 'configured_data_sources', lambda: [(path, 'rebel_json')])
+        monkeypatch.setattr(main, 'COMPARE_MAX_MEMBERS', 2)
+
+        try:
+            with TestClient(main.app) as client:
+                assert main.data_ready.wait(10)
+                result = client.get('/api/trajectories/rebel_traj_00000/compare').json()
+                assert (result['total'], result['aligned']) == (4, 2)
+                assert [r['id'] for r in result['results']] == ['rebel_traj_00001', 'rebel_traj_00002']
+
+                result = client.get('/api/compare', params={'a': 'rebel_traj_00000', 'b': 'rebel_traj_00001'}).json()
+                assert result['same_task'] and result['matched'] == 1
+                assert result['divergence'] == {'a': 1, 'b': 1}
+        finally:
+            main.reset_loaded_data()
+    print("[OK] Compare endpoints test passed!")
+
+
+if __name__ == '__main__':
+    test_myers_matches()
+    test_align_actions()
+    with pytest.MonkeyPatch.context() as mp:
+        test_compare_endpoints(mp)
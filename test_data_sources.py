@@ -0,0 +1,79 @@
+"""
+测试服务端数据源配置
+验证 data_sources.json 和 DATA_SOURCES 环境变量，以及压缩分片数据源可以通过服务加载
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def write_config(path, entries):
+    path.write_text(json.dumps({'data_sources': entries}), encoding='utf-8')
+
+
+def test_data_sources_config(monkeypatch):
+    """读取启用的条目，相对路径以 DATA_ROOT 为基准；DATA_SOURCES 优先"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        config = tmp / 'data_sources.json'
+        write_config(config, [
+            {'name': 'a', 'path': 'data/rebel_*.jsonl.gz', 'type': 'rebel_json', 'enabled': True},
+            {'name': 'b', 'path': 'data/old.json', 'type': 'rebel_json', 'enabled': False},
+            {'name': 'c', 'path': 'data/hf'},
+        ])
+        monkeypatch.setattr(main, 'DATA_SOURCES_CONFIG', config)
+        monkeypatch.setattr(main, 'DATA_ROOT', tmp)
+        monkeypatch.delenv('DATA_SOURCES', raising=False)
+        assert main.configured_data_sources() == [
+            (tmp / 'data/rebel_*.jsonl.gz', 'rebel_json'),
+            (tmp / 'data/hf', None),
+        ]
+
+        monkeypatch.setenv('DATA_SOURCES', os.pathsep.join(['x/a.json.zst', 'x/b_*.jsonl']))
+        assert main.configured_data_sources() == [(tmp / 'x/a.json.zst', None), (tmp / 'x/b_*.jsonl', None)]
+    print("[OK] Data sources config test passed!")
+
+
+def test_sharded_source_served(monkeypatch):
+    """配置中的压缩分片通配符经后台加载后可以通过接口访问"""
+    items = [{'task': f'put some apple {i} on sidetable.', 'done': 'True',
+              'data': [{'step': 1, 'obs': 'obs', 'response': f'<action>go to shelf {i}</action>'}]} for i in range(4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for shard, chunk in enumerate([items[:2], items[2:]]):
+            with gzip.open(tmp / f'rebel_{shard}.jsonl.gz', 'wt', encoding='utf-8') as f:
+                f.writelines(json.dumps(item) + '\n' for item in chunk)
+        config = tmp / 'data_sources.json'
+        write_config(config, [{'name': 'shards', 'path': 'rebel_*.jsonl.gz', 'type': 'rebel_json', 'enabled': True}])
+        monkeypatch.setattr(main, 'DATA_SOURCES_CONFIG', config)
+        monkeypatch.setattr(main, 'DATA_ROOT', tmp)
+        monkeypatch.delenv('DATA_SOURCES', raising=False)
+        monkeypatch.setattr(main.trajectory_loader, 'shard_workers', 1)
+
+        try:
+            with TestClient(main.app) as client:
+                assert main.data_ready.wait(10)
+                response = client.get('/api/trajectories')
+                assert [t['id'] for t in response.json()] == [f'rebel_traj_{i:05d}' for i in range(4)]
+                assert client.get('/health/ready').json()['sources'][0]['format'] == 'rebel_json'
+        finally:
+            main.reset_loaded_data()
+    print("[OK] Sharded source served test passed!")
+
+
+if __name__ == '__main__':
+    with pytest.MonkeyPatch.context() as mp:
+        test_data_sources_config(mp)
+    with pytest.MonkeyPatch.context() as mp:
+        test_sharded_source_served(mp)
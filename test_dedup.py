@@ -0,0 +1,43 @@
+"""
+测试轨迹去重
+验证精确重复与近似重复能被归入同一个簇
+"""
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_adapters import Message, Trajectory
+from trajectory_dedup import TrajectoryDeduplicator
+
+
+def make_trajectory(traj_id, task, actions):
+    """构造只包含 agent 动作的轨迹"""
+    messages = [Message('agent', a, action=a) for a in actions]
+    return Trajectory(traj_id, task, 'success', len(actions), 'put', messages)
+
+
+def test_dedup():
+    """测试去重簇分配"""
+    actions = [f"go to cabinet {i}" for i in range(1, 30)] + ["take cellphone 1 from cabinet 29"]
+    dedup = TrajectoryDeduplicator()
+
+    original = make_trajectory('a', 'put some cellphone on sidetable.', actions)
+    exact = make_trajectory('b', 'Put some  cellphone on sidetable', [a.upper() for a in actions])
+    near = make_trajectory('c', 'put some cellphone on sidetable.', actions[:-1] + ["take cellphone 2 from cabinet 29"])
+    other = make_trajectory('d', 'heat some egg and put it in garbagecan.', ["go to fridge 1", "open fridge 1"])
+
+    assert dedup.add(original) == 'a'
+    assert dedup.add(exact) == 'a'
+    assert exact.metadata['duplicate'] == 'exact'
+    assert dedup.add(near) == 'a'
+    assert near.metadata['duplicate'] == 'near'
+    assert dedup.add(other) == 'd'
+    assert other.metadata['duplicate'] is None
+    assert dedup.cluster_size('a') == 3
+    print("[OK] Dedup test passed!")
+
+
+if __name__ == '__main__':
+    test_dedup()
@@ -0,0 +1,33 @@
+"""
+测试轨迹行为特征
+验证动词直方图、循环得分和访问位置数
+"""
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_adapters import Message, Trajectory
+from trajectory_features import action_verb, extract_features, verb_histogram
+
+
+def test_extract_features():
+    """来回走动和重复 look 都计入循环得分"""
+    actions = ['look', 'look', 'go to cabinet 1', 'go to drawer 2', 'go to cabinet 1',
+               'go to drawer 2', 'take pen 1 from drawer 2', 'Frobnicate', 'think: I need a pen', 'think:']
+    messages = [Message('agent', a, action=a) for a in actions]
+    features = extract_features(Trajectory('t', 'find a pen', 'failed', len(actions), 'find', messages))
+
+    assert verb_histogram(features['verb_counts']) == {'go': 4, 'take': 1, 'look': 2, 'think': 2, 'other': 1}
+    assert features['unique_locations'] == 2
+    # 第 2 个 look 与前一个相同，第 5、6 个动作与前两个相同
+    assert features['loop_score'] == round(3 / 10, 4)
+    assert action_verb('think: i need a pen') == 'think'
+    assert action_verb('thinking about it') == 'other'
+    assert action_verb('') == 'other'
+    print("[OK] Feature extraction test passed!")
+
+
+if __name__ == '__main__':
+    test_extract_features()
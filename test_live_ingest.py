@@ -0,0 +1,220 @@
+"""
+测试实时追踪
+验证增量读取偏移量、不完整行缓冲、截断/替换重置、无效行、慢订阅者断开、episode 的移除和压缩，以及压缩快照读取期间的重建
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import pytest
+
+import main
+from live_ingest import LiveTailer
+
+
+def step_line(step, action, **extra):
+    record = {'step': step, 'obs': f'observation {step}', 'response': f'<action>{action}</action>', **extra}
+    return json.dumps(record) + '\n'
+
+
+def poll(tailer):
+    """同步执行一轮读取和应用，返回 (更新, 已消失的 episode)"""
+    updates, removed = tailer.read_increments()
+    for episode, truncated, records in updates:
+        tailer.apply(episode, truncated, records)
+    for episode_id in removed:
+        tailer.remove(episode_id)
+    return updates, removed
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_offsets_and_partial_lines():
+    """只读取新增内容，不完整的行等换行到达后才解析"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'ep1.jsonl'
+            tailer = LiveTailer(Path(tmp))
+            first = step_line(0, 'look', task='find a pen')
+            second = step_line(1, 'go to desk 1')
+            path.write_text(first + second[:10], encoding='utf-8')
+
+            updates, _ = poll(tailer)
+            episode = tailer.episodes['ep1']
+            assert [len(records) for _, _, records in updates] == [1]
+            assert episode.offset == path.stat().st_size
+            assert episode.pending == second[:10].encode()
+            assert episode.task == 'find a pen'
+
+            queue = tailer.subscribe('ep1')
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(second[10:] + 'not json\n')
+            updates, _ = poll(tailer)
+            assert [len(records) for _, _, records in updates] == [2]
+            assert episode.pending == b''
+            assert episode.steps == 2
+            assert episode.invalid_lines == 1
+            assert [e['type'] for e in drain(queue)] == ['step']
+
+            # 文件没有变化时不产生更新
+            assert poll(tailer) == ([], [])
+    asyncio.run(run())
+    print("[OK] Offsets and partial lines test passed!")
+
+
+def test_truncation_and_replacement():
+    """文件被截断或替换时从头重新读取，并推送 reset 事件"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'ep1.jsonl'
+            tailer = LiveTailer(Path(tmp))
+            path.write_text(step_line(0, 'look') + step_line(1, 'look', done='False'), encoding='utf-8')
+            poll(tailer)
+            episode = tailer.episodes['ep1']
+            assert episode.steps == 2 and episode.done == 'False'
+            queue = tailer.subscribe('ep1')
+
+            # 截断为更短的内容
+            path.write_text(step_line(0, 'inventory'), encoding='utf-8')
+            poll(tailer)
+            assert [e['type'] for e in drain(queue)] == ['reset', 'step']
+            assert episode.steps == 1 and episode.done is None
+            assert episode.messages[-1]['action'] == 'inventory'
+
+            # 用更长的新文件替换（inode 变化，大小没有变小）
+            replacement = Path(tmp) / 'ep1.tmp'
+            replacement.write_text(step_line(0, 'look') + step_line(1, 'look') + step_line(2, 'look'),
+                                   encoding='utf-8')
+            os.replace(replacement, path)
+            poll(tailer)
+            assert [e['type'] for e in drain(queue)] == ['reset', 'step', 'step', 'step']
+            assert episode.steps == 3
+    asyncio.run(run())
+    print("[OK] Truncation and replacement test passed!")
+
+
+def test_slow_subscriber_disconnected():
+    """队列满时清空队列并放入 None，订阅者被移除"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'ep1.jsonl'
+            tailer = LiveTailer(Path(tmp), queue_size=2)
+            path.write_text(step_line(0, 'look'), encoding='utf-8')
+            poll(tailer)
+
+            slow = tailer.subscribe('ep1')
+            with open(path, 'a', encoding='utf-8') as f:
+                f.writelines(step_line(i, 'look') for i in range(1, 4))
+            poll(tailer)
+            assert drain(slow) == [None]
+            assert 'ep1' not in tailer._subscribers
+    asyncio.run(run())
+    print("[OK] Slow subscriber test passed!")
+
+
+def test_removed_and_compacted_episodes():
+    """文件删除后移除 episode；结束且空闲的 episode 释放消息，文件变化时重建"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            tailer = LiveTailer(tmp, episode_ttl=60)
+            (tmp / 'gone.jsonl').write_text(step_line(0, 'look'), encoding='utf-8')
+            done_path = tmp / 'done.jsonl'
+            done_path.write_text(step_line(0, 'look') + step_line(1, 'look', done='True'), encoding='utf-8')
+            poll(tailer)
+            watcher = tailer.subscribe()
+
+            (tmp / 'gone.jsonl').unlink()
+            poll(tailer)
+            assert 'gone' not in tailer.episodes
+            assert drain(watcher) == [{'type': 'removed', 'episode': 'gone'}]
+
+            episode = tailer.episodes['done']
+            tailer.compact_idle(now=episode.updated_at + 30)
+            assert not episode.compacted
+            tailer.compact_idle(now=episode.updated_at + 61)
+            assert episode.compacted and episode.messages == []
+            assert episode.summary()['messages'] == 4
+            assert [m['action'] for m in tailer.load_messages(episode) if m['role'] == 'agent'] == ['look', 'look']
+
+            # 下次检查之前不读取文件
+            with open(done_path, 'a', encoding='utf-8') as f:
+                f.write(step_line(2, 'inventory'))
+            assert poll(tailer) == ([], [])
+
+            # 到期后发现文件变化，从头重建
+            episode.next_check = 0
+            poll(tailer)
+            assert not episode.compacted
+            assert episode.steps == 3 and len(episode.messages) == 6
+    asyncio.run(run())
+    print("[OK] Removed and compacted episodes test passed!")
+
+
+def test_compacted_snapshot_rebuilt_during_read(monkeypatch):
+    """读取已压缩 episode 的文件期间发生重建时，改用内存快照并丢弃已包含的事件"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            tailer = LiveTailer(tmp, episode_ttl=60)
+            monkeypatch.setattr(main, 'live_tailer', tailer)
+            path = tmp / 'ep1.jsonl'
+            path.write_text(step_line(0, 'look', done='True'), encoding='utf-8')
+            await tailer.poll()
+            episode = tailer.episodes['ep1']
+            tailer.compact_idle(now=episode.updated_at + 61)
+
+            # 未发生变化：快照来自文件
+            queue = tailer.subscribe('ep1')
+            snapshot = await main._live_snapshot(episode, queue)
+            assert snapshot['compacted'] and len(snapshot['messages']) == 2
+
+            started, release = threading.Event(), threading.Event()
+            load_messages = tailer.load_messages
+
+            def slow_load(ep):
+                messages = load_messages(ep)
+                started.set()
+                release.wait(5)
+                return messages
+
+            monkeypatch.setattr(tailer, 'load_messages', slow_load)
+            pending = asyncio.ensure_future(main._live_snapshot(episode, queue))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+
+            # 读取期间文件追加了步骤，轮询把 episode 重建并推送 reset / step 事件
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(step_line(1, 'inventory'))
+            episode.next_check = 0
+            await tailer.poll()
+            assert not queue.empty()
+
+            release.set()
+            snapshot = await pending
+            assert not snapshot['compacted']
+            assert [m['action'] for m in snapshot['messages'] if m['role'] == 'agent'] == ['look', 'inventory']
+            assert queue.empty()
+    asyncio.run(run())
+    print("[OK] Compacted snapshot race test passed!")
+
+
+if __name__ == '__main__':
+    test_offsets_and_partial_lines()
+    test_truncation_and_replacement()
+    test_slow_subscriber_disconnected()
+    test_removed_and_compacted_episodes()
+    with pytest.MonkeyPatch.context() as mp:
+        test_compacted_snapshot_rebuilt_during_read(mp)
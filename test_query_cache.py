@@ -0,0 +1,99 @@
+"""
+测试列表筛选结果缓存
+验证缓存键归一化、LRU 淘汰顺序和数据版本变化时的失效
+"""
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import numpy as np
+
+from trajectory_table import FilterResultCache, normalize_filters
+
+
+def test_normalize_filters():
+    """等价的筛选条件映射到同一个键"""
+    base = normalize_filters(status='failed', min_steps=None, max_steps=None, descending=False)
+    assert base == (('status', 'failed'),)
+    # 下限为 0 等价于不筛选
+    assert normalize_filters(status='failed', min_steps=0) == base
+    # 空字符串和 False 等价于未传
+    assert normalize_filters(status='failed', task_type='', unique_only=False) == base
+    # 未排序时方向无意义
+    assert normalize_filters(status='failed', descending=True) == base
+    assert normalize_filters(status='failed', sort_by='steps', descending=True) == (
+        ('descending', True), ('sort_by', 'steps'), ('status', 'failed'))
+    # 上限为 0 是有效条件，不能丢弃
+    assert normalize_filters(max_steps=0) == (('max_steps', 0),)
+    # 参数顺序不影响键
+    assert normalize_filters(task_type='put', status='success') == normalize_filters(status='success', task_type='put')
+    print("[OK] Filter normalization test passed!")
+
+
+def test_lru_eviction():
+    """超出容量时淘汰最久未使用的条目"""
+    cache = FilterResultCache(max_entries=2)
+    computed = []
+
+    def lookup(key, version=(0, 10)):
+        def compute():
+            computed.append(key)
+            return np.array([len(computed)])
+        return cache.get_or_compute(key, version, compute)
+
+    lookup('a')
+    lookup('b')
+    lookup('a')  # a 变为最近使用
+    lookup('c')  # 淘汰 b
+    assert cache.stats()['evictions'] == 1
+    lookup('a')
+    lookup('c')
+    assert computed == ['a', 'b', 'c']
+    lookup('b')  # b 需要重新计算，并淘汰 a
+    assert computed == ['a', 'b', 'c', 'b']
+    stats = cache.stats()
+    assert stats['evictions'] == 2
+    assert stats['entries'] == 2
+    assert (stats['hits'], stats['misses']) == (3, 4)
+    print("[OK] LRU eviction test passed!")
+
+
+def test_version_invalidation():
+    """数据版本 (generation, size) 变化时整体失效"""
+    cache = FilterResultCache()
+    cache.get_or_compute('a', (0, 10), lambda: np.array([1]))
+    assert cache.get_or_compute('a', (0, 10), lambda: np.array([2]))[0] == 1
+
+    # 追加了行
+    assert cache.get_or_compute('a', (0, 11), lambda: np.array([3]))[0] == 3
+    # 重新加载（行数相同但 generation 变化）
+    assert cache.get_or_compute('a', (1, 11), lambda: np.array([4]))[0] == 4
+    stats = cache.stats()
+    assert stats['invalidations'] == 2
+    assert stats['entries'] == 1
+    print("[OK] Version invalidation test passed!")
+
+
+def test_stale_result_not_cached():
+    """计算期间数据版本变化时，旧版本的结果不写入缓存"""
+    cache = FilterResultCache()
+
+    def stale_compute():
+        # 计算过程中另一个请求已经看到了新版本
+        cache.get_or_compute('other', (0, 11), lambda: np.array([0]))
+        return np.array([1])
+
+    assert cache.get_or_compute('a', (0, 10), stale_compute)[0] == 1
+    assert cache.stats()['entries'] == 1
+    # 新版本下 a 必须重新计算
+    assert cache.get_or_compute('a', (0, 11), lambda: np.array([2]))[0] == 2
+    print("[OK] Stale result test passed!")
+
+
+if __name__ == '__main__':
+    test_normalize_filters()
+    test_lru_eviction()
+    test_version_invalidation()
+    test_stale_result_not_cached()
@@ -0,0 +1,110 @@
+"""
+测试后台加载期间的就绪检查和部分结果
+加载未完成时 /health/ready 返回 503、列表接口带 X-Partial-Results，加载完成后恢复正常
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from trajectory_adapters import Message, Trajectory, TrajectoryAdapter
+
+
+class GatedAdapter(TrajectoryAdapter):
+    """产出第一条轨迹后等待放行，模拟耗时较长的加载"""
+
+    id_prefix = 'gated'
+
+    def __init__(self):
+        self.first_loaded = threading.Event()
+        self.release = threading.Event()
+
+    def detect(self, path):
+        return path.suffix == '.gated'
+
+    def iter_raw(self, path, progress=None):
+        yield {'task': 'find a pen'}
+        self.first_loaded.set()
+        self.release.wait(10)
+        yield {'task': 'find a key'}
+
+    def parse(self, raw_item, idx):
+        messages = [Message('agent', 'look', action='look')]
+        return Trajectory(self.make_id(idx), raw_item['task'], 'failed', 1, 'find', messages)
+
+
+def test_readiness_and_partial_results(monkeypatch):
+    """加载期间返回部分结果，加载完成后就绪"""
+    adapter = GatedAdapter()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'source.gated'
+        path.write_text('', encoding='utf-8')
+        monkeypatch.setitem(main.trajectory_loader.adapters, 'gated', adapter)
+        monkeypatch.setattr(main, 'configured_data_sources', lambda: [(path, None)])
+
+        try:
+            with TestClient(main.app) as client:
+                try:
+                    assert adapter.first_loaded.wait(10)
+                    # 适配器产出第一条后，加载线程还需要把它写入索引
+                    for _ in range(100):
+                        if main.trajectory_index:
+                            break
+                        time.sleep(0.01)
+
+                    response = client.get('/health/ready')
+                    assert response.status_code == 503
+                    assert response.json()['ready'] is False
+
+                    response = client.get('/api/trajectories')
+                    assert response.headers.get('X-Partial-Results') == 'true'
+                    assert [t['task'] for t in response.json()] == ['find a pen']
+                finally:
+                    adapter.release.set()
+
+                assert main.data_ready.wait(10)
+                response = client.get('/health/ready')
+                assert response.status_code == 200
+                assert response.json()['trajectories_loaded'] == 2
+
+                response = client.get('/api/trajectories')
+                assert 'X-Partial-Results' not in response.headers
+                assert len(response.json()) == 2
+        finally:
+            main.reset_loaded_data()
+    print("[OK] Readiness test passed!")
+
+
+def test_background_load_failure(monkeypatch):
+    """加载线程在数据源循环之外异常退出时，就绪检查给出错误而不是一直静默加载中"""
+    def broken_sources():
+        raise RuntimeError("bad data source config")
+
+    monkeypatch.setattr(main, 'configured_data_sources', broken_sources)
+    try:
+        with TestClient(main.app) as client:
+            for _ in range(100):
+                if main.load_error:
+                    break
+                time.sleep(0.01)
+            response = client.get('/health/ready')
+            assert response.status_code == 503
+            assert response.json()['error'] == 'RuntimeError: bad data source config'
+    finally:
+        main.reset_loaded_data()
+    print("[OK] Background load failure test passed!")
+
+
+if __name__ == '__main__':
+    with pytest.MonkeyPatch.context() as mp:
+        test_readiness_and_partial_results(mp)
+    with pytest.MonkeyPatch.context() as mp:
+        test_background_load_failure(mp)
@@ -0,0 +1,96 @@
+"""
+测试随机抽样
+验证样本量分配（最大余数法 / 平均分配）、合并层上的无放回抽样和固定种子的可复现性
+"""
+import random
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_table import SummaryTable, _allocate, _sample_lists
+
+
+def test_proportional_allocation():
+    """按比例分配，余数给小数部分最大的层，并列时取靠前的层"""
+    # 精确值 4.2 / 2.1 / 0.7：余数给第 3 层，而不是第 1 层
+    assert _allocate(7, [6, 3, 1], 'proportional') == [4, 2, 1]
+    # 精确值 2.5 / 1.5 / 1.0：并列时取第 1 层
+    assert _allocate(5, [5, 3, 2], 'proportional') == [3, 1, 1]
+    assert _allocate(2, [1, 1, 1], 'proportional') == [1, 1, 0]
+    # 样本量不少于总体时全部抽取
+    assert _allocate(100, [6, 3, 1], 'proportional') == [6, 3, 1]
+    print("[OK] Proportional allocation test passed!")
+
+
+def test_equal_allocation():
+    """平均分配，装满的层把余量让给其他层"""
+    assert _allocate(9, [1, 10, 10], 'equal') == [1, 4, 4]
+    assert _allocate(10, [0, 2, 20], 'equal') == [0, 2, 8]
+    assert _allocate(2, [5, 5, 5], 'equal') == [1, 1, 0]
+    for size in range(0, 22):
+        quotas = _allocate(size, [1, 10, 10], 'equal')
+        assert sum(quotas) == min(size, 21)
+        assert all(q <= p for q, p in zip(quotas, [1, 10, 10]))
+    print("[OK] Equal allocation test passed!")
+
+
+def test_sample_lists_without_replacement():
+    """在多个行号列表的前 count 个元素上无放回抽样"""
+    # 99 在 count 之外（列表在抽样后才追加的行），不能被抽到
+    lists = [([10, 11, 12, 99], 3), ([20, 21], 2)]
+    assert sorted(_sample_lists(lists, 5, random.Random(0))) == [10, 11, 12, 20, 21]
+    for seed in range(50):
+        picked = _sample_lists(lists, 3, random.Random(seed))
+        assert len(set(picked)) == 3
+        assert 99 not in picked
+    assert _sample_lists([], 0, random.Random(0)) == []
+    print("[OK] Sampling without replacement test passed!")
+
+
+def make_table():
+    table = SummaryTable()
+    rng = random.Random(1)
+    for i in range(300):
+        table.append({
+            'id': f'traj_{i:05d}',
+            'status': rng.choice(['success', 'failed', 'unknown']),
+            'steps': 10,
+            'task_type': rng.choice(['put', 'clean', 'heat']),
+            'metadata': {'source': 'rebel'},
+        })
+    return table
+
+
+def test_stratified_sample():
+    """按 task_type 分层时合并各状态的细分层，抽样结果不重复且可复现"""
+    table = make_table()
+    view = table.snapshot()
+    task_types = table.categories['task_type'].values
+    statuses = table.categories['status'].values
+
+    rows, report = table.sample(30, random.Random(7), stratify_by=('task_type',), status='failed')
+    assert len(rows) == len(set(rows)) == 30
+    assert all(statuses[view['status'][row]] == 'failed' for row in rows)
+    assert sum(entry['sampled'] for entry in report) == 30
+    for entry in report:
+        population = sum(1 for row in range(table.size)
+                         if task_types[view['task_type'][row]] == entry['task_type']
+                         and statuses[view['status'][row]] == 'failed')
+        assert entry['population'] == population
+        assert sum(1 for row in rows if task_types[view['task_type'][row]] == entry['task_type']) == entry['sampled']
+
+    # 相同种子结果相同，不同种子结果不同
+    again, _ = table.sample(30, random.Random(7), stratify_by=('task_type',), status='failed')
+    other, _ = table.sample(30, random.Random(8), stratify_by=('task_type',), status='failed')
+    assert again == rows
+    assert other != rows
+    print("[OK] Stratified sample test passed!")
+
+
+if __name__ == '__main__':
+    test_proportional_allocation()
+    test_equal_allocation()
+    test_sample_lists_without_replacement()
+    test_stratified_sample()
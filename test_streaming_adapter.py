@@ -0,0 +1,135 @@
+"""
+测试流式适配器协议
+验证 JSON 数组在任意块边界下都能被逐条正确解析
+"""
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_adapters import (LoadProgress, Message, REBELJSONAdapter, Trajectory, TrajectoryAdapter,
+                                 TrajectoryLoader, iter_json_array)
+
+
+def test_iter_json_array():
+    """测试不同块大小下的流式解析"""
+    items = [
+        {'task': 'put some cellphone on sidetable.', 'done': 'True',
+         'data': [{'step': 1, 'obs': 'You arrive at cabinet 1.', 'response': '<action>look</action>'}]},
+        1, 23, 456.5, -1e5, "a ] , b", [1, [2]], None,
+    ]
+    text = json.dumps(items, indent=2)
+    for chunk_size in [1, 2, 3, 7, 64, 1 << 20]:
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == items
+    assert list(iter_json_array(io.StringIO(' [ ] '), 1)) == []
+    print("[OK] iter_json_array test passed!")
+
+
+def test_rebel_iter_parsed():
+    """测试 REBEL 适配器的 iter_parsed"""
+    items = [{'task': f'put some apple {i} on sidetable.', 'done': 'True',
+              'data': [{'step': 1, 'obs': 'obs', 'response': '<action>look</action>'}]} for i in range(5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'rebel.json'
+        path.write_text(json.dumps(items), encoding='utf-8')
+
+        adapter = REBELJSONAdapter()
+        assert adapter.detect(path)
+        trajectories = list(adapter.iter_parsed(path))
+        assert [t.id for t in trajectories] == [f"rebel_traj_{i:05d}" for i in range(5)]
+        assert all(t.steps == 1 and t.status == 'success' for t in trajectories)
+    print("[OK] REBEL iter_parsed test passed!")
+
+
+def test_compressed_shards():
+    """测试压缩分片：ID 跨分片连续，且与单文件加载结果一致"""
+    import gzip
+    items = [{'task': f'put some apple {i} on sidetable.', 'done': 'True',
+              'data': [{'step': 1, 'obs': 'obs', 'response': f'<action>go to shelf {i}</action>'}]} for i in range(10)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / 'full.json').write_text(json.dumps(items), encoding='utf-8')
+        with gzip.open(tmp / 'part_00.json.gz', 'wt', encoding='utf-8') as f:
+            json.dump(items[:4], f)
+        with gzip.open(tmp / 'part_01.jsonl.gz', 'wt', encoding='utf-8') as f:
+            f.writelines(json.dumps(item) + '\n' for item in items[4:])
+
+        for workers in [1, 2]:
+            loader = TrajectoryLoader(deduplicate=False, shard_workers=workers)
+            full = loader.load(tmp / 'full.json')
+            sharded = loader.load(tmp / 'part_*')
+            assert [t.to_dict() for t in sharded] == [t.to_dict() for t in full]
+            assert sharded[-1].id == 'rebel_traj_00009'
+    print("[OK] Compressed shards test passed!")
+
+
+def test_shards_with_bad_records():
+    """解析失败的记录同样占序号，分片与单文件的 ID 一致"""
+    items = [{'task': f'put some apple {i} on sidetable.', 'done': 'True',
+              'data': [{'step': 1, 'obs': 'obs', 'response': f'<action>go to shelf {i}</action>'}]} for i in range(6)]
+    items[1] = {'task': 'broken', 'data': 'not a list'}
+    items[4] = {'task': 'broken', 'data': 5}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / 'full.json').write_text(json.dumps(items), encoding='utf-8')
+        (tmp / 'p_00.json').write_text(json.dumps(items[:2]), encoding='utf-8')
+        (tmp / 'p_01.json').write_text(json.dumps(items[2:5]), encoding='utf-8')
+        (tmp / 'p_02.json').write_text(json.dumps(items[5:]), encoding='utf-8')
+
+        expected = ['rebel_traj_00000', 'rebel_traj_00002', 'rebel_traj_00003', 'rebel_traj_00005']
+        for workers in [1, 2]:
+            loader = TrajectoryLoader(deduplicate=False, shard_workers=workers)
+            full = loader.load(tmp / 'full.json')
+            progress = LoadProgress(str(tmp / 'p_*.json'))
+            sharded = list(loader.iter_load(tmp / 'p_*.json', progress=progress))
+            assert [t.id for t in full] == expected
+            assert [t.to_dict() for t in sharded] == [t.to_dict() for t in full]
+            assert progress.items_parsed == 4 and progress.items_failed == 2
+    print("[OK] Shards with bad records test passed!")
+
+
+class LegacyLinesAdapter(TrajectoryAdapter):
+    """只实现 iter_raw(self, path) 旧签名的第三方适配器"""
+
+    id_prefix = 'legacy'
+
+    def detect(self, path):
+        return path.suffix == '.lines'
+
+    def iter_raw(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                yield {'task': line.strip()}
+
+    def parse(self, raw_item, idx):
+        messages = [Message('agent', 'look', action='look')]
+        return Trajectory(self.make_id(idx), raw_item['task'], 'unknown', 1, 'other', messages)
+
+
+def test_legacy_iter_raw_adapter():
+    """不接受 progress 参数的适配器仍可通过加载器加载"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'tasks.lines'
+        path.write_text('find a pen\nfind a key\n', encoding='utf-8')
+
+        loader = TrajectoryLoader(deduplicate=False)
+        loader.register_adapter('legacy_lines', LegacyLinesAdapter())
+        progress = LoadProgress(str(path))
+        trajectories = list(loader.iter_load(path, progress=progress))
+
+        assert [t.task for t in trajectories] == ['find a pen', 'find a key']
+        assert progress.items_parsed == 2
+        assert progress.bytes_read == progress.bytes_total > 0
+    print("[OK] Legacy iter_raw adapter test passed!")
+
+
+if __name__ == '__main__':
+    test_iter_json_array()
+    test_rebel_iter_parsed()
+    test_compressed_shards()
+    test_shards_with_bad_records()
+    test_legacy_iter_raw_adapter()
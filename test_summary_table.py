@@ -0,0 +1,133 @@
+"""
+测试列式摘要表
+与逐行遍历字典列表的原实现比较筛选、排序、统计和数据源结果，并覆盖列数组扩容
+"""
+import random
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_table import SummaryTable
+
+
+def make_rows(n, seed=0):
+    """生成带重复簇和行为特征的合成轨迹字典"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        traj_id = f"traj_{i:05d}"
+        # 约三分之一的轨迹归入之前某条轨迹的簇
+        cluster_id = rows[rng.randrange(i)]['metadata']['cluster_id'] if i and rng.random() < 0.3 else traj_id
+        rows.append({
+            'id': traj_id,
+            'status': rng.choice(['success', 'failed', 'unknown']),
+            'steps': rng.randint(0, 20),
+            'task_type': rng.choice(['put', 'clean', 'heat', 'other']),
+            'metadata': {'source': rng.choice(['huggingface', 'rebel']), 'cluster_id': cluster_id},
+            'features': {'loop_score': rng.choice([0.0, 0.25, 0.5]), 'unique_locations': rng.randint(0, 5),
+                         'verb_counts': [0] * 16},
+        })
+    return rows
+
+
+def reference_filter(rows, status=None, task_type=None, min_steps=None, max_steps=None,
+                     cluster_id=None, unique_only=False, sort_by=None, descending=False):
+    """原 get_trajectories 的逐行筛选和排序"""
+    matched = [
+        i for i, t in enumerate(rows)
+        if (not status or t['status'] == status)
+        and (not task_type or t['task_type'] == task_type)
+        and (min_steps is None or t['steps'] >= min_steps)
+        and (max_steps is None or t['steps'] <= max_steps)
+        and (not cluster_id or t['metadata']['cluster_id'] == cluster_id)
+        and (not unique_only or t['metadata']['cluster_id'] == t['id'])
+    ]
+    if sort_by:
+        key = (lambda i: rows[i]['steps']) if sort_by == 'steps' else (lambda i: rows[i]['features'][sort_by])
+        # sorted 在 reverse=True 时同样保持同值元素的原有顺序
+        matched = sorted(matched, key=key, reverse=descending)
+    return matched
+
+
+def build_table(rows):
+    table = SummaryTable(capacity=2)
+    for row in rows:
+        table.append(row, row['features'])
+    return table
+
+
+def test_filter_matches_reference():
+    """多种筛选和排序组合与逐行实现一致（capacity=2，追加过程中多次扩容）"""
+    rows = make_rows(300)
+    table = build_table(rows)
+    assert table.size == 300 and len(table.ids) >= 300
+
+    cluster_with_members = rows[150]['metadata']['cluster_id']
+    cases = [
+        {},
+        {'status': 'failed'},
+        {'status': 'success', 'task_type': 'heat'},
+        {'min_steps': 5, 'max_steps': 12},
+        {'max_steps': 0},
+        {'unique_only': True},
+        {'cluster_id': cluster_with_members},
+        {'task_type': 'put', 'unique_only': True, 'min_steps': 3},
+        {'sort_by': 'steps'},
+        {'status': 'failed', 'sort_by': 'steps', 'descending': True},
+        {'sort_by': 'loop_score', 'descending': True},
+        {'sort_by': 'unique_locations'},
+    ]
+    for case in cases:
+        assert table.filter(**case).tolist() == reference_filter(rows, **case), case
+    print("[OK] Filter test passed!")
+
+
+def test_unknown_category_values():
+    """表中不存在的类别值匹配不到任何行"""
+    table = build_table(make_rows(50))
+    assert table.filter(status='running').tolist() == []
+    assert table.filter(task_type='slice').tolist() == []
+    assert table.filter(cluster_id='no_such_cluster').tolist() == []
+    assert SummaryTable().filter(status='failed').tolist() == []
+    print("[OK] Unknown category test passed!")
+
+
+def test_statistics_and_sources():
+    """统计和数据源与逐行实现一致"""
+    rows = make_rows(300, seed=1)
+    table = build_table(rows)
+
+    by_status, by_task_type, by_source = {}, {}, {}
+    first_id = {}
+    for t in rows:
+        by_status[t['status']] = by_status.get(t['status'], 0) + 1
+        by_task_type[t['task_type']] = by_task_type.get(t['task_type'], 0) + 1
+        source = t['metadata']['source']
+        by_source[source] = by_source.get(source, 0) + 1
+        first_id.setdefault(source, t['id'])
+    unique_clusters = sum(1 for t in rows if t['metadata']['cluster_id'] == t['id'])
+
+    assert table.statistics() == {
+        'total': 300,
+        'by_status': by_status,
+        'by_task_type': by_task_type,
+        'by_source': by_source,
+        'avg_steps': round(sum(t['steps'] for t in rows) / len(rows), 2),
+        'unique_clusters': unique_clusters,
+        'duplicates': 300 - unique_clusters,
+    }
+    assert sorted(table.sources(), key=lambda s: s['format']) == [
+        {'count': by_source[source], 'format': source, 'sample_id': first_id[source]}
+        for source in sorted(by_source)
+    ]
+    empty = SummaryTable().statistics()
+    assert empty['total'] == 0 and empty['avg_steps'] == 0
+    print("[OK] Statistics and sources test passed!")
+
+
+if __name__ == '__main__':
+    test_filter_matches_reference()
+    test_unknown_category_values()
+    test_statistics_and_sources()
@@ -0,0 +1,51 @@
+"""
+测试加载时校验报告
+验证解析失败原因、未知状态、空任务和缺失动作的计数
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+
+from trajectory_adapters import LoadProgress, TrajectoryLoader
+
+
+def test_validation_report():
+    """每类问题按数据源计数，不影响正常轨迹的加载"""
+    items = [
+        {'task': 'put a pen on desk.', 'done': 'True', 'data': [
+            {'step': 0, 'obs': 'You are in the middle of a room.', 'response': '<action>go to desk 1</action>'},
+            {'step': 1, 'obs': 'You arrive at desk 1.', 'response': '<action>put pen 1 in/on desk 1</action>'},
+        ]},
+        {'task': '', 'done': 'true', 'data': [
+            {'step': 0, 'obs': 'Nothing happens.', 'response': 'I am not sure what to do.'},
+        ]},
+        {'task': 'find a key.', 'done': None, 'data': []},
+        {'task': 'broken', 'data': 'not a list'},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'rebel.json'
+        path.write_text(json.dumps(items), encoding='utf-8')
+
+        progress = LoadProgress(str(path))
+        trajectories = list(TrajectoryLoader(deduplicate=False).iter_load(path, progress=progress))
+
+    report = progress.validation.to_dict()
+    assert len(trajectories) == 3
+    assert report['checked'] == 3
+    assert report['parse_failures'] == 1
+    assert report['failure_reasons'] == {'AttributeError': 1}
+    assert report['unknown_statuses'] == 2
+    assert report['unknown_status_values'] == {"'true'": 1, 'None': 1}
+    assert report['empty_tasks'] == 1
+    assert report['missing_actions'] == 2
+    assert report['agent_messages_without_action'] == 1
+    print("[OK] Validation report test passed!")
+
+
+if __name__ == '__main__':
+    test_validation_report()